@@ -22,20 +22,37 @@ Markdown Frontmatter 专业处理器 - 多语言优化版 v1.4
 import yaml
 import os
 import sys
+import time
 from pathlib import Path
-from typing import Dict, Tuple, Any, List, Optional, DefaultDict
-from collections import defaultdict
+from typing import Dict, Tuple, Any, List, Optional, DefaultDict, Callable, Iterable, TYPE_CHECKING
+from array import array
+from collections import OrderedDict
 from datetime import datetime, date
-import pandas as pd
-import webbrowser
-from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QFileDialog, QCheckBox, QTabWidget, QTableWidget,
-    QTableWidgetItem, QTextEdit, QMessageBox, QDialog, QDialogButtonBox, QLabel,
-    QComboBox, QProgressBar, QHeaderView
-)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QTextCursor, QTextCharFormat, QColor, QFont
+from types import SimpleNamespace
+
+if TYPE_CHECKING:
+    # 仅供类型注解使用，运行时按需导入（见 _load_gui、_build_parser 等）
+    import argparse
+    import cProfile
+    from PyQt6.QtCore import QThread
+
+# ====================
+# YAML 后端（优先使用 LibYAML C 扩展）
+# ====================
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+    YAML_BACKEND = 'libyaml'
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+    YAML_BACKEND = 'python'
+
+def yaml_load(stream: Any) -> Any:
+    """使用当前后端安全加载 YAML"""
+    return yaml.load(stream, Loader=YamlLoader)
+
+def yaml_dump(data: Any, stream: Any = None) -> Optional[str]:
+    """使用当前后端序列化 YAML，保持字段顺序和 Unicode 字符"""
+    return yaml.dump(data, stream, Dumper=YamlDumper, allow_unicode=True, sort_keys=False)
 
 # ====================
 # 多语言支持
@@ -351,79 +368,921 @@ class LanguageManager:
 # 工具类定义
 # ====================
 
-class ChangesDialog(QDialog):
-    """交互式变更确认对话框，显示文件变更详情"""
-    def __init__(self, file_path: str, changes: List[Dict[str, Any]], lang: LanguageManager, parent=None):
-        super().__init__(parent)
-        self.lang = lang
-        self.setWindowTitle(self.lang.get('confirm_changes').format(Path(file_path).name))
-        self.setMinimumSize(600, 400)
-        
-        layout = QVBoxLayout()
-        
-        self.text_edit = QTextEdit()
-        self.text_edit.setReadOnly(True)
-        
-        for change in changes:
-            self._append_change(
-                f"【{change['key']}】 {change.get('action', '修改')}:",
-                QColor(0, 0, 255)
-            )
-            old_val = f"{change['old_value']}" if change['old_value'] is not None else "空"
-            new_val = f"{change['new_value']}" if change['new_value'] is not None else "空"
-            self._append_change(f"  原值: {old_val}", QColor(128, 0, 0))
-            self._append_change(f"  新值: {new_val}", QColor(0, 100, 0))
-            self.text_edit.append("")
-        
-        layout.addWidget(self.text_edit)
-        
-        button_box = QDialogButtonBox(
-            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
-        )
-        button_box.accepted.connect(self.accept)
-        button_box.rejected.connect(self.reject)
-        layout.addWidget(button_box)
-        
-        self.setLayout(layout)
-    
-    def _append_change(self, text: str, color: QColor):
-        """添加带颜色格式的变更文本"""
-        cursor = self.text_edit.textCursor()
-        format_ = QTextCharFormat()
-        format_.setForeground(color)
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(text + "\n", format_)
-
-class ProcessingThread(QThread):
-    """文件处理线程，避免GUI冻结"""
-    progress_updated = pyqtSignal(int, str)  # 进度值, 当前文件
-    message_logged = pyqtSignal(str, str)    # 消息内容, 类型(info/warn/error)
-    processing_finished = pyqtSignal(str)    # 报告路径
-    
-    def __init__(self, processor, config: Dict[str, Any], lang: LanguageManager):
-        super().__init__()
-        self.processor = processor
-        self.config = config
-        self.lang = lang
-    
-    def run(self):
-        """线程主逻辑：批量处理文件并生成报告"""
+COPY_CHUNK_SIZE = 1 << 20  # 写入时复制正文的块大小（字节）
+MEMO_MAXSIZE = 65536  # 类型检测与类型转换记忆表的容量
+MEMO_SCALAR_TYPES = frozenset((str, int, float, bool, date, datetime))  # 可作为记忆键的标量类型
+EXCEL_MAX_ROWS = 1048576  # Excel 单个工作表的行数上限（含表头）
+REPORT_NAME = 'frontmatter_analysis_report'  # 报告文件（xlsx）或报告目录（其他格式）的名称
+PARQUET_BATCH_ROWS = 65536  # Parquet 报告每个记录批次的行数
+FRONTMATTER_READ_SIZE = 1 << 16  # 读取 frontmatter 时首次读取的字节数，不够时加倍续读
+READERS = ('stream', 'mmap')  # frontmatter 读取方式：分块读取或内存映射
+DEFAULT_INCLUDE = ('*.[mM][dD]',)  # 默认纳入处理的文件名模式
+SCAN_THREADS = 8  # 目录遍历的并发线程数
+ENGINES = ('serial', 'pipeline', 'async')  # 单进程处理时的执行方式
+ASYNC_CONCURRENCY = 32  # async 方式同时在途的文件读写数上限
+IO_THREADS = 4  # 流水线中读取与写入阶段各自的线程数
+PIPELINE_QUEUE_SIZE = 64  # 流水线每个阶段在途文件数的上限（背压）
+
+def _frontmatter_tokens(buf: Any) -> Tuple[Any, Any, Any, Any]:
+    """按缓冲区类型（str 或 bytes/bytearray/mmap）取得 (换行, 开始/结束分隔符, 备用结束分隔符, BOM)"""
+    if isinstance(buf, str):
+        return '\n', '---', '...', '\ufeff'
+    return b'\n', b'---', b'...', b'\xef\xbb\xbf'
+
+def frontmatter_opening(buf: Any) -> int:
+    """查找 frontmatter 开始分隔符，返回 YAML 内容的起始偏移；没有 frontmatter 时返回 -1
+
+    跳过 BOM 和开头的空白行，第一个非空行去掉首尾空白后必须恰好是 ---。
+    """
+    newline, dashes, _, bom = _frontmatter_tokens(buf)
+    size = len(buf)
+    pos = len(bom) if buf[:len(bom)] == bom else 0
+    while pos < size:
+        end = buf.find(newline, pos)
+        line_end = size if end < 0 else end + 1
+        line = buf[pos:line_end].strip()
+        if line:
+            return line_end if line == dashes else -1
+        pos = line_end
+    return -1
+
+def frontmatter_closing(buf: Any, yaml_start: int) -> Optional[Tuple[int, int]]:
+    """从 yaml_start 起查找结束分隔符行（恰好为 --- 或 ...，允许行尾空白和 \\r）
+
+    只用 find 定位以分隔符开头的行，不逐行切片；返回 (YAML 内容结束偏移, 正文起始偏移)，
+    找不到时返回 None。
+    """
+    newline, dashes, dots, _ = _frontmatter_tokens(buf)
+    size = len(buf)
+    if buf[yaml_start:yaml_start + 3] in (dashes, dots):
+        candidate = yaml_start  # 空 frontmatter：开始分隔符之后紧跟结束分隔符
+    else:
+        candidate = -1
+    search = max(yaml_start - 1, 0)
+    while True:
+        if candidate < 0:
+            hits = [i for i in (buf.find(newline + dashes, search), buf.find(newline + dots, search)) if i >= 0]
+            if not hits:
+                return None
+            candidate = min(hits) + 1
+        end = buf.find(newline, candidate)
+        line_end = size if end < 0 else end + 1
+        if buf[candidate:line_end].rstrip() in (dashes, dots):
+            return candidate, line_end
+        search = candidate
+        candidate = -1
+
+def locate_frontmatter(buf: Any) -> Optional[Tuple[int, int, int]]:
+    """在 str、bytes 或 mmap 中定位 frontmatter，返回 (YAML 起始, YAML 结束, 正文起始) 偏移
+
+    偏移均相对于原缓冲区，调用方按需切片，正文不会被复制。没有完整的
+    frontmatter 时返回 None。
+    """
+    yaml_start = frontmatter_opening(buf)
+    if yaml_start < 0:
+        return None
+    closing = frontmatter_closing(buf, yaml_start)
+    if closing is None:
+        return None
+    return (yaml_start,) + closing
+
+class SeparatorMatcher:
+    """列表分隔符匹配引擎：按配置的分隔符构建一次，之后复用
+
+    分隔符按配置顺序预先整理为优先级元组（去掉空串），查找时逐个做
+    `sep in value` 检查。分隔符通常只有几个，这比正则扫描加去重更快。
+    """
+    _instances = {}
+    
+    def __init__(self, separators: Iterable[str]):
+        self.separators = tuple(sep for sep in separators if sep)
+    
+    @classmethod
+    def for_separators(cls, separators: Any = None) -> 'SeparatorMatcher':
+        """取得分隔符对应的匹配器（按分隔符元组缓存），None 表示默认分隔符"""
+        if isinstance(separators, cls):
+            return separators
+        key = tuple(separators) if separators else (',', ';', '|')
+        matcher = cls._instances.get(key)
+        if matcher is None:
+            matcher = cls._instances[key] = cls(key)
+        return matcher
+    
+    def find(self, value: str) -> Optional[str]:
+        """返回 value 中出现的、按配置顺序优先级最高的分隔符"""
+        return next((sep for sep in self.separators if sep in value), None)
+    
+    def split(self, value: str) -> Optional[List[str]]:
+        """按优先级最高的分隔符拆分并去除空白项；没有分隔符时返回 None"""
+        sep = self.find(value)
+        if sep is None:
+            return None
+        return [x.strip() for x in value.split(sep) if x.strip()]
+    
+    def is_list_candidate(self, value: str) -> bool:
+        """字符串是否可能是列表：YAML 列表写法或包含分隔符"""
+        return value.lstrip().startswith('-') or self.find(value) is not None
+
+class DirectoryWalker:
+    """基于 os.scandir 的并发目录遍历
+
+    各目录的 scandir 由线程池并发执行：每列出一个目录就立即提交其子目录，
+    线程池因此始终领先于消费方。迭代时按与 sorted(rglob()) 相同的路径顺序
+    流式返回匹配文件的路径字符串，无需等待整个目录树遍历完成。
+    include/exclude 为 glob 模式，同时匹配条目名和相对于根目录的 POSIX 路径；
+    exclude 命中的目录整体跳过（如 .git、node_modules）；skip 为相对于根目录的
+    POSIX 路径，对应目录同样整体跳过（用于排除位于输入目录内的输出目录）。found 为已发现的
+    匹配文件总数，可用于设置进度范围。
+    """
+    
+    def __init__(self, root: Any, include: Iterable[str] = DEFAULT_INCLUDE,
+                 exclude: Iterable[str] = (), threads: int = SCAN_THREADS,
+                 metrics: Optional['RunMetrics'] = None, skip: Iterable[str] = ()):
+        self.root = str(root)
+        self.metrics = metrics
+        self.include = tuple(include) or DEFAULT_INCLUDE
+        self.exclude = tuple(exclude)
+        self.skip = frozenset(skip)
+        self.threads = max(1, threads)
+        self.found = 0
+        self._stopped = False
+        import threading
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _matches(patterns: Tuple[str, ...], name: str, relpath: str) -> bool:
+        from fnmatch import fnmatchcase
+        return any(fnmatchcase(name, p) or fnmatchcase(relpath, p) for p in patterns)
+    
+    def _scan(self, directory: str, rel: str) -> List[Tuple[str, str, str, bool]]:
+        """列出单个目录：返回按名称排序的 (名称, 路径, 相对路径, 是否目录)，已应用过滤规则"""
+        start = time.perf_counter()
+        entries = []
         try:
-            report_path = self.processor.process_directory(
-                input_dir=self.config['input_dir'],
-                output_dir=self.config['output_dir'],
-                merge_map=self.config['merge_map'],
-                field_types=self.config['field_types'],
-                default_values=self.config['default_values'],
-                ignore_null_conflicts=self.config['ignore_null_conflicts'],
-                overwrite=self.config['overwrite'],
-                thread=self,
-                lang=self.lang,
-                list_separators=self.config.get('list_separators', [',', ';', '|'])
-            )
-            self.processing_finished.emit(report_path)
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    relpath = f"{rel}/{name}" if rel else name
+                    if self.exclude and self._matches(self.exclude, name, relpath):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if relpath not in self.skip:
+                                entries.append((name, entry.path, relpath, True))
+                        elif entry.is_file() and self._matches(self.include, name, relpath):
+                            entries.append((name, entry.path, relpath, False))
+                    except OSError:
+                        continue
+        except OSError:
+            # 与 rglob 一致：无法读取的目录直接跳过
+            pass
+        entries.sort()
+        if self.metrics:
+            self.metrics.add_time('discover', time.perf_counter() - start)
+            self.metrics.count('directories')
+        return entries
+    
+    def _listing(self, submit: Callable, directory: str, rel: str) -> List[Tuple[str, Any]]:
+        """线程池任务：列出目录并立即提交子目录；返回 (路径, 子目录 Future 或 None)"""
+        listing = []
+        files = 0
+        for name, path, relpath, is_dir in self._scan(directory, rel):
+            if is_dir:
+                future = submit(path, relpath)
+                if future is not None:
+                    listing.append((path, future))
+            else:
+                listing.append((path, None))
+                files += 1
+        with self._lock:
+            self.found += files
+        return listing
+    
+    def __iter__(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            def submit(directory: str, rel: str):
+                with self._lock:
+                    if self._stopped:
+                        return None
+                return pool.submit(self._listing, submit, directory, rel)
+            
+            try:
+                stack = [iter(submit(self.root, '').result())]
+                while stack:
+                    entry = next(stack[-1], None)
+                    if entry is None:
+                        stack.pop()
+                        continue
+                    path, future = entry
+                    if future is None:
+                        yield path
+                    else:
+                        stack.append(iter(future.result()))
+            finally:
+                # 消费方提前结束时停止提交新的目录任务
+                with self._lock:
+                    self._stopped = True
+
+class PipelineStage:
+    """处理流水线中的一个阶段及其统计
+
+    threads 大于 0 时为线程池阶段：map() 按输入顺序返回结果，在途任务数不超过
+    capacity，下游取走结果后上游才能继续提交（背压）。threads 为 0 时阶段在
+    调用方线程中运行，通过 call() 计时。统计项：处理数、失败数、工作耗时
+    （各线程累计）、下游等待本阶段结果的耗时、最大在途数。
+    """
+    
+    def __init__(self, name: str, threads: int = 0, capacity: int = PIPELINE_QUEUE_SIZE):
+        import threading
+        self._clock = time.perf_counter
+        self._lock = threading.Lock()
+        self.name = name
+        self.threads = threads
+        self.capacity = max(capacity, threads, 1)
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.waited = 0.0
+        self.max_depth = 0
+    
+    def _timed(self, func: Callable, item: Any) -> Any:
+        start = self._clock()
+        try:
+            return func(item)
+        finally:
+            elapsed = self._clock() - start
+            with self._lock:
+                self.busy += elapsed
+    
+    def call(self, func: Callable, *args) -> Any:
+        """在当前线程中执行一次本阶段的工作并计时"""
+        start = self._clock()
+        try:
+            return func(*args)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.busy += self._clock() - start
+            self.items += 1
+    
+    def _collect(self, item: Any, future: Any) -> Tuple[Any, Any, Optional[Exception]]:
+        start = self._clock()
+        try:
+            result, error = future.result(), None
         except Exception as e:
-            self.message_logged.emit(f"处理过程中发生致命错误: {str(e)}", "error")
+            result, error = None, e
+            self.errors += 1
+        self.waited += self._clock() - start
+        self.items += 1
+        return item, result, error
+    
+    def map(self, func: Callable, items: Iterable):
+        """在线程池中对 items 执行 func，按输入顺序产出 (输入, 结果, 异常)"""
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max(self.threads, 1)) as pool:
+            for item in items:
+                if len(pending) >= self.capacity:
+                    yield self._collect(*pending.popleft())
+                pending.append((item, pool.submit(self._timed, func, item)))
+                self.max_depth = max(self.max_depth, len(pending))
+            while pending:
+                yield self._collect(*pending.popleft())
+    
+    def summary(self) -> List[Tuple[str, Any]]:
+        """报告“运行信息”中本阶段的统计行"""
+        label = f"Stage {self.name.title()}"
+        return [
+            (f"{label} Items", self.items),
+            (f"{label} Errors", self.errors),
+            (f"{label} Busy Seconds", round(self.busy, 3)),
+            (f"{label} Wait Seconds", round(self.waited, 3)),
+            (f"{label} Max In Flight", self.max_depth),
+        ]
+
+class RunMetrics:
+    """一次运行的结构化统计：分阶段计时与计数器
+
+    阶段计时为各线程/进程的累计耗时（秒）及调用次数，计数器为整数累加值。
+    多线程阶段（目录遍历、流水线读写）并发更新，因此累加时加锁；进程池
+    分片的统计通过 as_dict()/merge() 合并到主进程。
+    """
+    STAGES = ('discover', 'read', 'parse', 'detect', 'transform', 'dump', 'write', 'report')
+    
+    def __init__(self):
+        import threading
+        self._lock = threading.Lock()
+        self.clock = time.perf_counter
+        self.reset()
+    
+    def set(self, name: str, value: int):
+        with self._lock:
+            self.counters[name] = value
+    
+    def reset(self):
+        self.started = self.clock()
+        self.timers = {stage: 0.0 for stage in self.STAGES}
+        self.calls = {stage: 0 for stage in self.STAGES}
+        self.counters = {}
+    
+    def add_time(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            self.timers[stage] = self.timers.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + calls
+    
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """可跨进程传递的原始统计"""
+        with self._lock:
+            return {'timers': dict(self.timers), 'calls': dict(self.calls), 'counters': dict(self.counters)}
+    
+    def merge(self, data: Dict[str, Any]):
+        """合并 as_dict() 的结果（如进程池分片的统计）"""
+        for stage, seconds in data['timers'].items():
+            self.add_time(stage, seconds, data['calls'].get(stage, 0))
+        for name, value in data['counters'].items():
+            self.count(name, value)
+    
+    def summary(self, **labels: Any) -> Dict[str, Any]:
+        """本轮运行的 JSON 摘要"""
+        data = self.as_dict()
+        return dict(labels, **{
+            'wall_seconds': round(self.clock() - self.started, 4),
+            'stages': {
+                stage: {'seconds': round(seconds, 4), 'calls': data['calls'].get(stage, 0)}
+                for stage, seconds in data['timers'].items()
+            },
+            'counters': data['counters'],
+        })
+    
+    def prometheus(self, **labels: Any) -> str:
+        """Prometheus 文本格式（node_exporter textfile collector）；数值均为最近一次运行的值，类型为 gauge"""
+        data = self.as_dict()
+        base = ','.join(f'{key}="{value}"' for key, value in labels.items())
+        
+        def label_set(**extra):
+            parts = [base] if base else []
+            parts += [f'{key}="{value}"' for key, value in extra.items()]
+            return '{' + ','.join(parts) + '}' if parts else ''
+        
+        lines = [
+            '# HELP frontmatter_stage_seconds Cumulative time spent in each processing stage during the last run.',
+            '# TYPE frontmatter_stage_seconds gauge',
+        ]
+        lines += [f"frontmatter_stage_seconds{label_set(stage=stage)} {seconds:.6f}"
+                  for stage, seconds in data['timers'].items()]
+        lines += [
+            '# HELP frontmatter_stage_calls Number of timed calls of each processing stage during the last run.',
+            '# TYPE frontmatter_stage_calls gauge',
+        ]
+        lines += [f"frontmatter_stage_calls{label_set(stage=stage)} {calls}"
+                  for stage, calls in data['calls'].items()]
+        for name, value in sorted(data['counters'].items()):
+            lines += [f'# TYPE frontmatter_{name} gauge', f"frontmatter_{name}{label_set()} {value}"]
+        lines += [
+            '# HELP frontmatter_run_wall_seconds Wall-clock duration of the last run.',
+            '# TYPE frontmatter_run_wall_seconds gauge',
+            f"frontmatter_run_wall_seconds{label_set()} {self.clock() - self.started:.6f}",
+            '# TYPE frontmatter_run_timestamp_seconds gauge',
+            f"frontmatter_run_timestamp_seconds{label_set()} {time.time():.3f}",
+        ]
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path: str, **labels: Any):
+        """原子写入 Prometheus textfile，避免采集器读到写了一半的文件"""
+        target = Path(path)
+        temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        temp_path.write_text(self.prometheus(**labels), encoding='utf-8')
+        os.replace(temp_path, target)
+
+class FileSet:
+    """TypeConflictStore 中某字段某类型的文件集合视图，迭代时返回文件路径"""
+    __slots__ = ('_paths', 'ids')
+    
+    def __init__(self, paths: List[str], ids: array):
+        self._paths = paths
+        self.ids = ids
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __iter__(self):
+        paths = self._paths
+        return (paths[file_id] for file_id in self.ids)
+
+class TypeConflictStore:
+    """字段类型统计的紧凑存储
+
+    文件路径只在路径表中保存一次并映射为整数 ID，字段名和类型名经过驻留，
+    每个 (字段, 类型) 的文件集合是一个 array('I') 的文件 ID 列表。对外提供与
+    原先 {字段: {类型: {路径}}} 嵌套字典相同的只读查询方式（items/values/
+    下标/len），类型对应的文件集合为 FileSet 视图。
+    """
+    
+    def __init__(self):
+        self.paths = []       # 文件 ID -> 路径
+        self._path_ids = {}   # 路径 -> 文件 ID
+        self._fields = {}     # 字段 -> {类型: array('I')}
+    
+    def _file_id(self, filepath: str) -> int:
+        file_id = self._path_ids.get(filepath)
+        if file_id is None:
+            file_id = self._path_ids[filepath] = len(self.paths)
+            self.paths.append(filepath)
+        return file_id
+    
+    def add_file(self, filepath: str, field_types: Dict[str, str]):
+        """记录一个文件中各字段检测到的类型"""
+        known = filepath in self._path_ids
+        file_id = self._file_id(filepath)
+        fields = self._fields
+        for key, type_name in field_types.items():
+            by_type = fields.get(key)
+            if by_type is None:
+                by_type = fields[sys.intern(key)] = {}
+            ids = by_type.get(type_name)
+            if ids is None:
+                ids = by_type[sys.intern(type_name)] = array('I')
+            elif known and file_id in ids:
+                # 同一文件重复记录时保持集合语义
+                continue
+            ids.append(file_id)
+    
+    def add(self, key: str, type_name: str, filepath: str):
+        """记录单个 (字段, 类型, 文件)"""
+        self.add_file(filepath, {key: type_name})
+    
+    def clear(self):
+        self.paths.clear()
+        self._path_ids.clear()
+        self._fields.clear()
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    def __iter__(self):
+        return iter(self._fields)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields
+    
+    def __getitem__(self, key: str) -> Dict[str, FileSet]:
+        return {type_name: FileSet(self.paths, ids) for type_name, ids in self._fields[key].items()}
+    
+    def items(self):
+        for key in self._fields:
+            yield key, self[key]
+    
+    def values(self):
+        for key in self._fields:
+            yield self[key]
+
+class LRUMemo:
+    """有界 LRU 记忆表，统计命中与未命中次数"""
+    
+    def __init__(self, maxsize: int = MEMO_MAXSIZE):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """返回 key 对应的结果，未命中时调用 compute 计算并缓存（异常不缓存）"""
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            value = self.data[key] = compute()
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+            return value
+        self.hits += 1
+        self.data.move_to_end(key)
+        return value
+    
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> Tuple[int, int]:
+        return self.hits, self.misses
+
+class WriteJournal:
+    """覆盖模式的预写日志
+
+    替换源文件之前，先把原始文件硬链接（不支持时复制）到日志目录，并以
+    fsync 过的 JSON Lines 记录下来；替换完成后追加 commit 记录。每个进程
+    写自己的日志文件，因此可在进程池中并发使用。rollback 按时间倒序恢复
+    所有记录过的原始文件。
+    """
+    
+    def __init__(self, journal_dir: str):
+        import json
+        self._json = json
+        self.dir = Path(journal_dir)
+        self.originals_dir = self.dir / 'originals'
+        self.originals_dir.mkdir(parents=True, exist_ok=True)
+        self.run_id = f"{int(time.time() * 1000)}-{os.getpid()}-{os.urandom(4).hex()}"
+        self._seq = 0
+        import threading
+        self._lock = threading.Lock()  # 流水线的多个写入线程共用同一日志
+        self._file = open(self.dir / f"journal-{self.run_id}.jsonl", 'a', encoding='utf-8')
+    
+    def _append(self, record: Dict[str, Any], durable: bool):
+        """追加一条日志记录，durable 为 True 时立即落盘"""
+        line = self._json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if durable:
+                os.fsync(self._file.fileno())
+    
+    def begin(self, filepath: str) -> int:
+        """保存原始文件并记录，必须在替换源文件之前调用；返回记录序号"""
+        import shutil
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        backup = self.originals_dir / f"{self.run_id}-{seq}{Path(filepath).suffix}"
+        try:
+            os.link(filepath, backup)
+        except OSError:
+            shutil.copy2(filepath, backup)
+        self._append({'seq': seq, 'ts': time.time(), 'state': 'begin',
+                      'path': str(Path(filepath).resolve()), 'backup': backup.name}, durable=True)
+        return seq
+    
+    def commit(self, filepath: str, seq: int):
+        """记录源文件已被替换"""
+        self._append({'seq': seq, 'state': 'commit', 'path': str(Path(filepath).resolve())}, durable=False)
+    
+    def close(self):
+        self._file.close()
+    
+    @staticmethod
+    def rollback(journal_dir: str, log: Callable[[str, str], None]) -> Tuple[int, int]:
+        """按时间倒序将日志中记录的文件恢复为原始内容，返回 (恢复数, 失败数)"""
+        import json
+        import shutil
+        journal_path = Path(journal_dir)
+        entries = []
+        for journal_file in sorted(journal_path.glob('journal-*.jsonl')):
+            with open(journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 崩溃时可能残留不完整的最后一行
+                    if record.get('state') == 'begin':
+                        entries.append(record)
+        
+        restored = failed = 0
+        for record in sorted(entries, key=lambda r: r['ts'], reverse=True):
+            target = record['path']
+            temp_path = f"{target}.rollback.tmp"
+            try:
+                shutil.copy2(journal_path / 'originals' / record['backup'], temp_path)
+                os.replace(temp_path, target)
+                restored += 1
+            except OSError as e:
+                failed += 1
+                log(f"回滚文件 {target} 失败: {str(e)}", "error")
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+        return restored, failed
+
+class Checkpoint:
+    """断点续传清单：以 JSON Lines 定期记录已完成的文件
+
+    每条记录包含源文件路径（相对于输入目录的 POSIX 路径）、mtime 和大小，字段类型
+    映射、变更数以及结果文件（写出的文件，未写出时为源文件本身）的绝对路径、内容
+    哈希、mtime 和大小。续传时源文件和结果文件的 mtime、大小都未变化的文件直接跳过，
+    其字段类型从清单中恢复；输入目录的写法或当前目录不同也能匹配。
+    """
+    
+    def __init__(self, path: str, input_dir: str, resume: bool = False, interval: int = 500):
+        import json
+        self._json = json
+        self.input_dir = os.path.abspath(input_dir)
+        self.path = Path(path)
+        self.interval = max(1, interval)
+        self.done = {}
+        if resume and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 中断时可能残留不完整的最后一行
+                    self.done[record['path']] = record
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._pending = []
+    
+    def _key(self, filepath: str) -> str:
+        """记录的键：源文件相对于输入目录的 POSIX 路径"""
+        return Path(os.path.relpath(os.path.abspath(filepath), self.input_dir)).as_posix()
+    
+    def lookup(self, filepath: str) -> Tuple[bool, Optional[Dict[str, str]]]:
+        """查询文件是否已完成，返回 (是否跳过, 字段类型映射)"""
+        record = self.done.get(self._key(filepath))
+        if record is None:
+            return False, None
+        try:
+            source = os.stat(filepath)
+            st = os.stat(record['output']) if record['output'] else source
+        except OSError:
+            return False, None
+        if (source.st_mtime_ns, source.st_size) != (record.get('source_mtime_ns'), record.get('source_size')):
+            return False, None
+        if st.st_mtime_ns != record['mtime_ns'] or st.st_size != record['size']:
+            return False, None
+        return True, record['types']
+    
+    def add(self, filepath: str, field_types: Optional[Dict[str, str]], changes: int,
+            written: Optional[Tuple[str, str]]):
+        """记录一个已完成的文件，written 为 (输出路径, 内容哈希) 或 None"""
+        output, digest = written if written else (None, None)
+        source = os.stat(filepath)
+        st = os.stat(output) if output else source
+        self._pending.append({
+            'path': self._key(filepath), 'output': os.path.abspath(output) if output else None,
+            'source_mtime_ns': source.st_mtime_ns, 'source_size': source.st_size,
+            'types': field_types, 'changes': changes, 'hash': digest, 'mtime_ns': st.st_mtime_ns, 'size': st.st_size
+        })
+        if len(self._pending) >= self.interval:
+            self.flush()
+    
+    def flush(self):
+        """将缓冲的记录写入清单并落盘"""
+        if not self._pending:
+            return
+        self._file.write(''.join(self._json.dumps(r, ensure_ascii=False) + '\n' for r in self._pending))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending.clear()
+    
+    def close(self):
+        self.flush()
+        self._file.close()
+
+class AnalysisCache:
+    """增量分析缓存：以 SQLite 保存每个文件的字段类型映射
+
+    以路径 + mtime + 大小为键（可选内容哈希），未变化的文件直接复用上次的
+    检测结果。列表分隔符或缓存版本变化时整个缓存失效。
+    """
+    VERSION = 1
+    
+    def __init__(self, db_path: str, list_separators: List[str], use_hash: bool = False):
+        import sqlite3
+        import json
+        self._json = json
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self._stats = {}    # 本次运行中各文件的 (mtime_ns, size)
+        self._updates = []  # 待写入的记录
+        
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files "
+            "(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, hash TEXT, types TEXT)"
+        )
+        signature = json.dumps({'version': self.VERSION, 'list_separators': list(list_separators)})
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != signature:
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature,))
+            self.conn.commit()
+        self.entries = {
+            path: (mtime_ns, size, digest, types)
+            for path, mtime_ns, size, digest, types in self.conn.execute(
+                "SELECT path, mtime_ns, size, hash, types FROM files")
+        }
+    
+    @staticmethod
+    def _hash_file(filepath: str) -> str:
+        """计算文件内容的 BLAKE2b 摘要"""
+        import hashlib
+        digest = hashlib.blake2b(digest_size=16)
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def lookup(self, filepath: str) -> Tuple[bool, Optional[Dict[str, str]]]:
+        """查询缓存，返回 (是否命中, 字段类型映射)；映射为 None 表示该文件没有有效 frontmatter"""
+        st = os.stat(filepath)
+        self._stats[filepath] = (st.st_mtime_ns, st.st_size)
+        entry = self.entries.get(filepath)
+        if entry is not None:
+            mtime_ns, size, digest, types = entry
+            hit = mtime_ns == st.st_mtime_ns and size == st.st_size
+            if not hit and self.use_hash and digest and size == st.st_size:
+                hit = digest == self._hash_file(filepath)
+                if hit:
+                    self._updates.append((filepath, st.st_mtime_ns, st.st_size, digest, types))
+            if hit:
+                self.hits += 1
+                return True, self._json.loads(types) if types is not None else None
+        self.misses += 1
+        return False, None
+    
+    def store(self, filepath: str, field_types: Optional[Dict[str, str]]):
+        """记录文件的最新检测结果，None 表示没有有效 frontmatter"""
+        stat = self._stats.get(filepath)
+        if stat is None:
+            st = os.stat(filepath)
+            stat = (st.st_mtime_ns, st.st_size)
+        digest = self._hash_file(filepath) if self.use_hash else None
+        types = self._json.dumps(field_types, ensure_ascii=False) if field_types is not None else None
+        self._updates.append((filepath, stat[0], stat[1], digest, types))
+    
+    def save(self, seen_files: Iterable[str]):
+        """写入本次更新，删除已不存在的文件记录并关闭连接"""
+        seen = set(seen_files)
+        stale = [(path,) for path in self.entries if path not in seen]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, hash, types) VALUES (?, ?, ?, ?, ?)",
+                self._updates
+            )
+            self.conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        self.conn.close()
+
+class XlsxReportWriter:
+    """以 constant_memory 模式逐行写入 xlsx 报告，不经过 pandas
+
+    每行写完即刷出到磁盘，内存占用与行数无关；超过 Excel 行数上限的数据集
+    自动拆分为 “名称 (2)”、“名称 (3)” 等后续工作表，每个工作表都带表头。
+    """
+    
+    def __init__(self, report_dir: Path, max_rows: int = EXCEL_MAX_ROWS):
+        import xlsxwriter
+        self.path = report_dir / f"{REPORT_NAME}.xlsx"
+        self.workbook = xlsxwriter.Workbook(str(self.path), {'constant_memory': True})
+        self.header_format = self.workbook.add_format({'bold': True, 'border': 1})
+        self.max_rows = max_rows
+    
+    def _add_sheet(self, name: str, part: int, columns: Tuple[str, ...]):
+        if part > 1:
+            suffix = f" ({part})"
+            name = name[:31 - len(suffix)] + suffix
+        worksheet = self.workbook.add_worksheet(name[:31])
+        for col, title in enumerate(columns):
+            worksheet.write_string(0, col, title, self.header_format)
+        return worksheet
+    
+    def write_sheet(self, name: str, columns: Tuple[str, ...], rows: Iterable[tuple]) -> int:
+        """写入一个数据集，返回数据行数"""
+        part = 1
+        worksheet = self._add_sheet(name, part, columns)
+        row_num = 0
+        count = 0
+        for row in rows:
+            row_num += 1
+            if row_num >= self.max_rows:
+                part += 1
+                worksheet = self._add_sheet(name, part, columns)
+                row_num = 1
+            worksheet.write_row(row_num, 0, row)
+            count += 1
+        return count
+    
+    def close(self):
+        self.workbook.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class TableReportWriter:
+    """每个数据集写为报告目录下一个独立文件的报告基类
+
+    报告目录为 frontmatter_analysis_report/，数据集文件名由名称转换而来
+    （如 Type Conflicts → type_conflicts.csv.gz）。打开时先删除上次运行
+    留下的同格式文件，避免本次没有的数据集（如无类型冲突）残留旧结果。
+    """
+    SUFFIX = ''
+    
+    def __init__(self, report_dir: Path):
+        self.path = report_dir / REPORT_NAME
+        self.path.mkdir(parents=True, exist_ok=True)
+        for stale in self.path.glob(f"*{self.SUFFIX}"):
+            stale.unlink()
+    
+    def dataset_path(self, name: str) -> Path:
+        return self.path / (name.lower().replace(' ', '_') + self.SUFFIX)
+    
+    def write_sheet(self, name: str, columns: Tuple[str, ...], rows: Iterable[tuple]) -> int:
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class CsvReportWriter(TableReportWriter):
+    """gzip 压缩的 CSV 报告，带表头，UTF-8 编码"""
+    SUFFIX = '.csv.gz'
+    
+    def write_sheet(self, name: str, columns: Tuple[str, ...], rows: Iterable[tuple]) -> int:
+        import csv
+        import gzip
+        count = 0
+        with gzip.open(self.dataset_path(name), 'wt', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+class JsonlReportWriter(TableReportWriter):
+    """JSON Lines 报告，每行一个以列名为键的对象"""
+    SUFFIX = '.jsonl'
+    
+    def write_sheet(self, name: str, columns: Tuple[str, ...], rows: Iterable[tuple]) -> int:
+        import json
+        count = 0
+        with open(self.dataset_path(name), 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+                f.write('\n')
+                count += 1
+        return count
+
+class ParquetReportWriter(TableReportWriter):
+    """Parquet 报告（需要 pyarrow），按批次写入
+
+    列类型由首行推断：整数列为 int64，其余列统一为字符串。
+    """
+    SUFFIX = '.parquet'
+    
+    def __init__(self, report_dir: Path):
+        import pyarrow
+        import pyarrow.parquet
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        super().__init__(report_dir)
+    
+    def write_sheet(self, name: str, columns: Tuple[str, ...], rows: Iterable[tuple]) -> int:
+        pa = self.pa
+        rows = iter(rows)
+        batch = [row for _, row in zip(range(PARQUET_BATCH_ROWS), rows)]
+        int_cols = [
+            bool(batch) and isinstance(value, int) and not isinstance(value, bool)
+            for value in (batch[0] if batch else columns)
+        ]
+        schema = pa.schema([
+            (col, pa.int64() if is_int else pa.string()) for col, is_int in zip(columns, int_cols)
+        ])
+        count = 0
+        with self.pq.ParquetWriter(str(self.dataset_path(name)), schema) as writer:
+            while True:
+                arrays = [
+                    pa.array([row[i] if is_int else (None if row[i] is None else str(row[i])) for row in batch],
+                             type=field.type)
+                    for i, (field, is_int) in enumerate(zip(schema, int_cols))
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                count += len(batch)
+                batch = [row for _, row in zip(range(PARQUET_BATCH_ROWS), rows)]
+                if not batch:
+                    break
+        return count
+
+REPORT_WRITERS = {
+    'xlsx': XlsxReportWriter,
+    'csv': CsvReportWriter,
+    'jsonl': JsonlReportWriter,
+    'parquet': ParquetReportWriter,
+}
+REPORT_FORMATS = tuple(REPORT_WRITERS)
+REPORT_REQUIREMENTS = {'xlsx': 'xlsxwriter', 'parquet': 'pyarrow'}  # 各报告格式依赖的可选模块
+
+def report_format_missing(report_format: str) -> Optional[str]:
+    """报告格式所需但未安装的模块名；不缺少时返回 None"""
+    import importlib.util
+    module = REPORT_REQUIREMENTS.get(report_format)
+    if module and importlib.util.find_spec(module) is None:
+        return module
+    return None
 
 class FrontmatterAnalyzer:
     """Frontmatter分析与处理核心类"""
@@ -469,8 +1328,11 @@ class FrontmatterAnalyzer:
                 return None
     
     @staticmethod
-    def _convert_to_list(value: Any, separators: List[str] = [',', ';', '|']) -> List[Any]:
-        """将值转换为列表，支持多种分隔符和 YAML 列表格式"""
+    def _convert_to_list(value: Any, separators: Any = None) -> List[Any]:
+        """将值转换为列表，支持多种分隔符和 YAML 列表格式
+
+        separators 可以是分隔符列表或 SeparatorMatcher，None 表示默认的 , ; |
+        """
         if isinstance(value, list):
             return value
         if value is None:
@@ -479,22 +1341,42 @@ class FrontmatterAnalyzer:
         # 检测 YAML 列表格式，例如 "- item" 或 "-"
         if value_str.startswith('-'):
             try:
-                parsed = yaml.safe_load(value_str)
+                parsed = yaml_load(value_str)
                 if isinstance(parsed, list):
                     return parsed
             except yaml.YAMLError:
                 pass
         # 使用分隔符拆分
-        for sep in separators:
-            if sep in value_str:
-                return [x.strip() for x in value_str.split(sep) if x.strip()]
+        parts = SeparatorMatcher.for_separators(separators).split(value_str)
+        if parts is not None:
+            return parts
         # 如果没有分隔符，单值作为列表
         return [value_str] if value_str else []
     
     def __init__(self):
         self.log_callback = None
-        self.type_conflicts = defaultdict(lambda: defaultdict(set))  # 字段类型冲突记录
+        self.type_conflicts = TypeConflictStore()  # 字段类型冲突记录
         self.valid_files = []
+        self.input_dir = None  # 最近一次分析的根目录，报告中的路径相对于它
+        self.cache_stats = {}  # 最近一次分析的缓存命中统计
+        self.writes_skipped = 0  # 规则生效但序列化结果不变、因而跳过写入的文件数
+        self.journal = None  # 覆盖模式的写入日志（WriteJournal），为 None 时不记录
+        self.checkpoint = None  # 断点续传清单（Checkpoint），为 None 时不记录
+        self.plan = None  # 本轮批量处理编译好的转换计划（TransformPlan）
+        self.type_memo = LRUMemo()  # detect_type 的记忆表
+        self.convert_memo = LRUMemo()  # 类型转换结果的记忆表
+        self.resumed_files = 0  # 续传时从清单中跳过的文件数
+        self.last_write = None  # 最近一次 process_file 写出的 (路径, 内容哈希)
+        self.last_failed = False  # 最近一次 process_file 是否失败
+        self.include_patterns = list(DEFAULT_INCLUDE)  # 纳入处理的文件 glob 模式
+        self.exclude_patterns = []  # 跳过的文件或目录 glob 模式（如 .git、node_modules）
+        self.scan_threads = SCAN_THREADS  # 目录遍历的并发线程数
+        self.stages = []  # 最近一次流水线处理各阶段的统计（PipelineStage）
+        self.io_latency = 0.0  # 每次读取/写入文件前人为增加的延迟（秒），用于模拟高延迟文件系统
+        self.reader = 'stream'  # frontmatter 读取方式，见 READERS
+        self.metrics = RunMetrics()  # 本轮运行的分阶段计时与计数
+        self.parse_failures = set()  # 本轮 YAML 解析失败的文件，不写入分析缓存
+        self.skip_dirs = []  # 本轮批量处理的输出目录和写入日志目录，位于输入目录内时遍历跳过
     
     def log(self, value: str, level: str = "info"):
         """记录日志，调用回调函数或打印到控制台"""
@@ -502,13 +1384,29 @@ class FrontmatterAnalyzer:
             message = value
         else:
             message = str(value)
+        if level == "error":
+            self.metrics.count('errors')
         if self.log_callback:
             self.log_callback(message, level)
         else:
             print(f"[{level.upper()}] {message}")
     
-    def detect_type(self, value: Any, list_separators: List[str] = None) -> str:
-        """检测字段值的类型，改进对列表的识别"""
+    def detect_type(self, value: Any, list_separators: Any = None) -> str:
+        """检测字段值的类型，改进对列表的识别
+
+        list_separators 可以是分隔符列表或 SeparatorMatcher。可能是列表的字符串
+        需要分隔符拆分和 YAML 解析，结果按 (值, 匹配器) 记忆；普通字符串和其他
+        类型只是简单判断，直接计算比查记忆表更快。
+        """
+        matcher = SeparatorMatcher.for_separators(list_separators)
+        if type(value) is str:
+            if not matcher.is_list_candidate(value):
+                return 'str'
+            return self.type_memo.get((value, matcher), lambda: self._detect_type(value, matcher))
+        return self._detect_type(value, matcher)
+
+    def _detect_type(self, value: Any, matcher: SeparatorMatcher) -> str:
+        """detect_type 的实际实现（不经过记忆表）"""
         if value is None:
             return 'null'
         
@@ -524,9 +1422,9 @@ class FrontmatterAnalyzer:
                 return 'bool'
             if isinstance(value, str):
                 # 检查是否为 YAML 列表或包含分隔符
-                if value.strip().startswith('-') or any(sep in value for sep in list_separators or [',', ';', '|']):
+                if matcher.is_list_candidate(value):
                     try:
-                        parsed = self._convert_to_list(value, list_separators or [',', ';', '|'])
+                        parsed = self._convert_to_list(value, matcher)
                         if len(parsed) > 0:
                             return 'list'
                     except Exception:
@@ -537,150 +1435,428 @@ class FrontmatterAnalyzer:
             if isinstance(value, datetime):
                 return 'datetime'
         
-        for type_name, converter in self.SUPPORTED_TYPES.items():
-            try:
-                result = converter(value, list_separators or [',', ';', '|'])
-                if result is not None:
-                    return type_name
-            except (ValueError, TypeError):
-                continue
+        # 其余值（字典、集合等）不属于任何支持的类型
         return 'unknown'
 
-    def parse_frontmatter(self, content: str) -> Tuple[Optional[Dict[str, Any]], str]:
-        """解析 Markdown 文件中的 YAML frontmatter"""
-        content = content.strip()
-        if not content.startswith('---'):
+    def _load_frontmatter(self, text: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """解析 frontmatter 的 YAML 文本，返回 (字典或 None, 是否解析成功)"""
+        start = self.metrics.clock()
+        try:
+            frontmatter = yaml_load(text)
+        except yaml.YAMLError as e:
+            self.metrics.count('parse_errors')
+            self.log(f"yaml_error: {str(e)}", "error")
+            return None, False
+        finally:
+            self.metrics.add_time('parse', self.metrics.clock() - start)
+        if not isinstance(frontmatter, dict):
             self.log('invalid_frontmatter', "warning")
-            return None, content
-        
-        parts = content.split('---', 2)
-        if len(parts) < 3:
+            return None, True
+        return frontmatter, True
+
+    def _parse_block(self, filepath: str, text: str) -> Optional[Dict[str, Any]]:
+        """解析文件的 frontmatter 文本；YAML 解析失败时把文件记入 parse_failures"""
+        frontmatter, loaded = self._load_frontmatter(text)
+        if not loaded:
+            self.parse_failures.add(filepath)
+        return frontmatter
+
+    def parse_frontmatter(self, content: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """解析 Markdown 文件中的 YAML frontmatter，返回 (frontmatter, 正文)"""
+        span = locate_frontmatter(content)
+        if span is None:
             self.log('invalid_frontmatter', "warning")
             return None, content
         
-        try:
-            frontmatter = yaml.safe_load(parts[1])
-            if not isinstance(frontmatter, dict):
-                self.log('invalid_frontmatter', "warning")
-                return None, parts[2].lstrip()
-            return frontmatter, parts[2].lstrip()
-        except yaml.YAMLError as e:
-            self.log(f"yaml_error: {str(e)}", "error")
+        yaml_start, yaml_end, body_start = span
+        frontmatter, loaded = self._load_frontmatter(content[yaml_start:yaml_end])
+        if not loaded:
             return None, content
+        return frontmatter, content[body_start:].lstrip()
+
+    @staticmethod
+    def read_frontmatter_block(filepath) -> Tuple[Optional[str], int]:
+        """读取文件开头的 frontmatter 块，找到结束分隔符即停止
+
+        返回 (YAML 文本, 正文起始字节偏移)；文件没有 frontmatter 时返回 (None, 0)。
+        先读取 FRONTMATTER_READ_SIZE 字节，结束分隔符不在其中时加倍续读，
+        内存与 I/O 只与 frontmatter 大小相关，与正文长度无关。
+        """
+        with open(filepath, 'rb') as f:
+            buf = f.read(FRONTMATTER_READ_SIZE)
+            yaml_start = frontmatter_opening(buf)
+            while yaml_start < 0 or yaml_start == len(buf):
+                # 第一个非空行已完整读入却不是开始分隔符时没有 frontmatter；
+                # 否则该行可能被截断在读取边界上，需要续读
+                if yaml_start < 0 and b'\n' in buf[3 if buf.startswith(b'\xef\xbb\xbf') else 0:].lstrip():
+                    return None, 0
+                more = f.read(len(buf) or FRONTMATTER_READ_SIZE)
+                if not more:
+                    return None, 0
+                buf += more
+                yaml_start = frontmatter_opening(buf)
+            while True:
+                closing = frontmatter_closing(buf, yaml_start)
+                if closing is not None and (closing[1] < len(buf) or buf.endswith(b'\n')):
+                    return buf[yaml_start:closing[0]].decode('utf-8'), closing[1]
+                more = f.read(len(buf))
+                if not more:
+                    if closing is None:
+                        return None, 0
+                    return buf[yaml_start:closing[0]].decode('utf-8'), closing[1]
+                buf += more
+
+    @staticmethod
+    def map_frontmatter_block(filepath) -> Tuple[Optional[str], int]:
+        """以内存映射方式定位并解码 frontmatter 块，返回值同 read_frontmatter_block
+
+        分隔符直接在映射区上查找，只有 YAML 内容被复制并解码，正文不会产生任何
+        Python 对象；页面由操作系统按需载入。
+        """
+        import mmap
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None, 0  # 空文件无法映射
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                span = locate_frontmatter(mm)
+                if span is None:
+                    return None, 0
+                yaml_start, yaml_end, body_start = span
+                return mm[yaml_start:yaml_end].decode('utf-8'), body_start
+
+    def _read_block(self, filepath) -> Tuple[Optional[str], int]:
+        """按 self.reader 读取 frontmatter 块；设置了 io_latency 时先等待相应时间"""
+        start = self.metrics.clock()
+        if self.io_latency:
+            time.sleep(self.io_latency)
+        if self.reader == 'mmap':
+            block = self.map_frontmatter_block(filepath)
+        else:
+            block = self.read_frontmatter_block(filepath)
+        self.metrics.add_time('read', self.metrics.clock() - start)
+        self.metrics.count('files')
+        self.metrics.count('bytes_read', block[1])
+        return block
+
+    def _read_header(self, filepath) -> Tuple[Optional[Dict[str, Any]], int]:
+        """只读取并解析 frontmatter，不加载正文，返回 (frontmatter, 正文起始字节偏移)"""
+        text, body_offset = self._read_block(filepath)
+        if text is None:
+            self.log('invalid_frontmatter', "warning")
+            return None, 0
+        return self._parse_block(filepath, text), body_offset
+    
+    def _iter_markdown_files(self, input_path: Path) -> DirectoryWalker:
+        """按路径顺序流式遍历目录中符合 include/exclude 规则的文件（路径字符串）
+
+        遍历与写入同时进行，输出目录和写入日志目录位于输入目录内时整体跳过，
+        避免处理本轮刚写出的文件或日志中备份的原始文件。
+        """
+        root = input_path.resolve()
+        skip = []
+        for directory in self.skip_dirs:
+            directory = Path(directory).resolve()
+            if directory != root and root in directory.parents:
+                skip.append(directory.relative_to(root).as_posix())
+        return DirectoryWalker(input_path, self.include_patterns, self.exclude_patterns, self.scan_threads,
+                               self.metrics, skip)
     
-    def analyze_files(self, input_dir: str, lang: LanguageManager, list_separators: List[str]):
-        """分析目录中所有 Markdown 文件的 frontmatter"""
+    @staticmethod
+    def _emit_progress_range(thread: Optional['QThread'], total: int):
+        """通知界面已发现的文件总数，用作进度条范围"""
+        if thread:
+            thread.progress_range.emit(max(total, 1))
+
+    def _detect_types(self, frontmatter: Dict[str, Any], list_separators: Any) -> Dict[str, str]:
+        """检测 frontmatter 中每个字段的类型"""
+        start = self.metrics.clock()
+        matcher = SeparatorMatcher.for_separators(list_separators)
+        detected = {key: self.detect_type(value, matcher) for key, value in frontmatter.items()}
+        self.metrics.add_time('detect', self.metrics.clock() - start)
+        return detected
+
+    def _record_types(self, filepath: str, field_types: Dict[str, str]):
+        """记录有效文件及其字段类型映射"""
+        self.valid_files.append(filepath)
+        self.type_conflicts.add_file(filepath, field_types)
+
+    @staticmethod
+    def _resolve_workers(workers: Optional[int]) -> int:
+        """解析工作进程数：None 或小于 1 表示使用全部 CPU 核心"""
+        if workers is None or workers < 1:
+            return os.cpu_count() or 1
+        return workers
+
+    @staticmethod
+    def _make_shards(files: List[str], workers: int) -> List[List[str]]:
+        """将文件列表切分为若干分片，每个进程约 4 个分片以均衡负载"""
+        shard_size = max(1, min(500, -(-len(files) // (workers * 4))))
+        return [files[i:i + shard_size] for i in range(0, len(files), shard_size)]
+
+    def _record_result(self, filepath: str, field_types: Optional[Dict[str, str]]):
+        """记录单个文件的检测结果，None 表示没有有效 frontmatter"""
+        if field_types is not None:
+            self._record_types(filepath, field_types)
+
+    def _run_sharded(self, mode: str, files: List[str], options: Dict[str, Any], workers: int,
+                     thread: Optional['QThread'], lang: LanguageManager,
+                     on_record: Optional[Callable[[str, Optional[Dict[str, str]]], None]] = None) -> int:
+        """在进程池中分片执行分析或处理，并按分片顺序合并结果，返回有变更的文件数"""
+        on_record = on_record or self._record_result
+        from concurrent.futures import ProcessPoolExecutor
+        processed_files = 0
+        journal_dir = options.get('journal_dir') if mode == 'process' and options.get('overwrite') else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(journal_dir,)) as executor:
+            futures = [executor.submit(_run_shard, mode, shard, options)
+                       for shard in self._make_shards(files, workers)]
+            for future in futures:
+                result = future.result()
+                for message, level in result['logs']:
+                    self.log(message, level)
+                self.writes_skipped += result['writes_skipped']
+                for name, memo in (('type', self.type_memo), ('convert', self.convert_memo)):
+                    hits, misses = result['memo'][name]
+                    memo.hits += hits
+                    memo.misses += misses
+                self.metrics.merge(result['metrics'])
+                self.parse_failures.update(result['parse_failures'])
+                shard_types = {}
+                for filepath, field_types in result['records']:
+                    on_record(filepath, field_types)
+                    shard_types[filepath] = field_types
+                for filepath, changes, written, failed in result['changes']:
+                    if not failed:
+                        self._checkpoint_done(filepath, shard_types.get(filepath), len(changes), written)
+                    if changes:
+                        processed_files += 1
+                        self.log(f"{lang.get('file_processed').format(Path(filepath).name, len(changes))}", "info")
+                    if thread:
+                        thread.progress_updated.emit(processed_files, Path(filepath).name)
+        return processed_files
+
+    def _begin_run(self, input_dir: str):
+        """开始新一轮分析：清空统计结果并记录所用 YAML 后端"""
         self.type_conflicts.clear()
         self.valid_files.clear()
+        self.input_dir = input_dir
+        self.cache_stats = {}
+        self.writes_skipped = 0
+        self.resumed_files = 0
+        self.stages = []
+        self.metrics.reset()
+        self.parse_failures.clear()
+        self.type_memo.reset_stats()
+        self.convert_memo.reset_stats()
+        self.log(f"YAML 后端: {YAML_BACKEND}", "info")
+
+    def analyze_files(self, input_dir: str, lang: LanguageManager, list_separators: List[str],
+                      workers: int = 1, cache_path: Optional[str] = None, cache_hash: bool = False,
+                      engine: str = 'serial', concurrency: int = ASYNC_CONCURRENCY,
+                      io_threads: int = IO_THREADS, queue_size: int = PIPELINE_QUEUE_SIZE):
+        """分析目录中所有 Markdown 文件的 frontmatter
+
+        workers 大于 1 时使用多进程并行解析。指定 cache_path 时启用增量缓存，
+        只重新解析 mtime/大小（cache_hash 为 True 时还比较内容哈希）变化的文件。
+        单进程时 engine 为 'pipeline' 时用 io_threads 个读取线程（最多 queue_size 个
+        在途）、为 'async' 时用 asyncio（最多 concurrency 个在途）让多个文件的读取
+        同时进行，与 process_directory 相同；解析仍按目录顺序执行。
+        """
+        self._begin_run(input_dir)
         
         input_path = Path(input_dir)
         if not input_path.is_dir():
             self.log(f"{lang.get('invalid_input_dir')} {input_dir}", "error")
             return
         
-        for filepath in sorted(input_path.rglob("*.[mM][dD]")):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                frontmatter, _ = self.parse_frontmatter(content)
-                if not frontmatter:
+        files = list(self._iter_markdown_files(input_path))
+        cache = AnalysisCache(cache_path, list_separators, cache_hash) if cache_path else None
+        
+        def record(filepath: str, field_types: Optional[Dict[str, str]]):
+            # YAML 解析失败的文件不缓存，下次运行重新解析并再次报告错误
+            if cache and filepath not in self.parse_failures:
+                cache.store(filepath, field_types)
+            self._record_result(filepath, field_types)
+        
+        pending = files
+        if cache:
+            pending = []
+            for filepath in files:
+                try:
+                    hit, field_types = cache.lookup(filepath)
+                except OSError as e:
+                    self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
                     continue
-                
-                self.valid_files.append(str(filepath))
-                
-                for key, value in frontmatter.items():
-                    detected_type = self.detect_type(value, list_separators)
-                    self.type_conflicts[key][detected_type].add(str(filepath))
-                    
+                if hit:
+                    self._record_result(filepath, field_types)
+                else:
+                    pending.append(filepath)
+        
+        workers = self._resolve_workers(workers)
+        if workers > 1 and len(pending) > 1:
+            options = {'input_dir': input_dir, 'lang': lang.lang, 'list_separators': list_separators,
+                       'io_latency': self.io_latency, 'reader': self.reader}
+            self._run_sharded('analyze', pending, options, workers, None, lang, on_record=record)
+        elif engine in ('pipeline', 'async'):
+            self._analyze_blocks(pending, list_separators, record, engine, concurrency, io_threads, queue_size)
+        else:
+            for filepath in pending:
+                try:
+                    frontmatter, _ = self._read_header(filepath)
+                    record(filepath, self._detect_types(frontmatter, list_separators) if frontmatter else None)
+                except Exception as e:
+                    self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
+        
+        if cache:
+            cache.save(files)
+            self.cache_stats = {'hits': cache.hits, 'misses': cache.misses}
+            self.log(f"分析缓存: 命中 {cache.hits}，重新解析 {cache.misses}", "info")
+            # 缓存命中与重新解析的文件分开记录，恢复为目录遍历顺序
+            order = {filepath: index for index, filepath in enumerate(files)}
+            self.valid_files.sort(key=order.__getitem__)
+
+    def _analyze_blocks(self, files: List[str], list_separators: List[str],
+                        record: Callable[[str, Optional[Dict[str, str]]], None], engine: str, concurrency: int,
+                        io_threads: int = IO_THREADS, queue_size: int = PIPELINE_QUEUE_SIZE):
+        """并发读取 frontmatter 块，按目录顺序解析并记录检测结果"""
+        def analyze(filepath: str, block: Optional[Tuple[Optional[str], int]], error: Optional[Exception]):
+            if error is not None:
+                self.log(f"处理文件 {Path(filepath).name} 失败: {str(error)}", "error")
+                return
+            text = block[0]
+            if text is None:
+                self.log('invalid_frontmatter', "warning")
+                record(filepath, None)
+                return
+            try:
+                frontmatter = self._parse_block(filepath, text)
+                record(filepath, self._detect_types(frontmatter, list_separators) if frontmatter else None)
             except Exception as e:
-                self.log(f"处理文件 {filepath.name} 失败: {str(e)}", "error")
+                self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
+        
+        if engine == 'pipeline':
+            reader = PipelineStage('read', io_threads, queue_size)
+            self.stages = [reader]
+            for item in reader.map(self._read_block, files):
+                analyze(*item)
+            return
+        
+        async def worker(io):
+            async for item in self._aread_blocks(files, io, max(1, concurrency) * 2):
+                analyze(*item)
+        self._run_async(worker, concurrency)
+
+    def _write_file(self, filepath: str, input_dir: Optional[str], output_dir: str, overwrite: bool,
+                    frontmatter: Dict[str, Any], body_offset: int) -> Tuple[str, str]:
+        """写入新的 frontmatter，并从源文件的 body_offset 处分块复制正文字节，返回 (输出路径, 内容哈希)
+
+        正文不经过解码/编码，峰值内存与正文大小无关，写入时顺带计算内容哈希。先写入目标目录中的临时
+        文件并 fsync，再用 os.replace 原子替换，中途崩溃不会留下截断的文件。
+        覆盖模式下如启用了写入日志，替换前先保存原始文件以便回滚。
+        """
+        import hashlib
+        import shutil
+        import tempfile
+        clock = self.metrics.clock
+        start = clock()
+        if self.io_latency:
+            time.sleep(self.io_latency)
+        if overwrite:
+            output_file = Path(filepath)
+        else:
+            relative = Path(filepath).relative_to(Path(input_dir)) if input_dir else Path(Path(filepath).name)
+            output_file = Path(output_dir) / relative
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=output_file.parent, prefix=f".{output_file.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as dst, open(filepath, 'rb') as src:
+                # 沿用源文件 frontmatter 结束行的换行符
+                newline = '\n'
+                if body_offset >= 2:
+                    src.seek(body_offset - 2)
+                    if src.read(2) == b'\r\n':
+                        newline = '\r\n'
+                dump_start = clock()
+                header = '---\n' + yaml_dump(frontmatter) + '---\n'
+                if newline != '\n':
+                    header = header.replace('\n', newline)
+                dump_seconds = clock() - dump_start
+                digest = hashlib.blake2b(digest_size=16)
+                chunk = header.encode('utf-8')
+                written = 0
+                src.seek(body_offset)
+                while chunk:
+                    dst.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+                    chunk = src.read(COPY_CHUNK_SIZE)
+                dst.flush()
+                os.fsync(dst.fileno())
+            shutil.copymode(filepath, temp_path)
+            seq = self.journal.begin(filepath) if overwrite and self.journal else None
+            os.replace(temp_path, output_file)
+            if seq is not None:
+                self.journal.commit(filepath, seq)
+            self.metrics.add_time('dump', dump_seconds)
+            self.metrics.add_time('write', clock() - start - dump_seconds)
+            self.metrics.count('files_written')
+            self.metrics.count('bytes_written', written)
+            return str(output_file), digest.hexdigest()
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _transform(self, plan: 'TransformPlan', filepath: str,
+                   frontmatter: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """应用转换计划；序列化结果与原 frontmatter 一致时视为无变更，不需要写文件"""
+        clock = self.metrics.clock
+        start = clock()
+        new_frontmatter, changes = plan.apply(filepath, frontmatter)
+        applied = clock()
+        self.metrics.add_time('transform', applied - start)
+        if changes:
+            unchanged = yaml_dump(new_frontmatter) == yaml_dump(frontmatter)
+            self.metrics.add_time('dump', clock() - applied)
+            if unchanged:
+                changes = []
+                self.writes_skipped += 1
+        return new_frontmatter, changes
 
     def process_file(self, filepath: str, output_dir: str, merge_map: Dict[str, List[str]],
                     field_types: Dict[str, str], default_values: Dict[str, Tuple[str, Any]],
-                    ignore_null_conflicts: bool, overwrite: bool, thread: Optional[QThread],
-                    lang: LanguageManager, list_separators: List[str]) -> List[Dict[str, Any]]:
-        """处理单个 Markdown 文件，应用类型转换、合并和默认值"""
+                    ignore_null_conflicts: bool, overwrite: bool, thread: Optional['QThread'],
+                    lang: LanguageManager, list_separators: List[str], input_dir: Optional[str] = None,
+                    parsed: Optional[Tuple[Dict[str, Any], int]] = None) -> List[Dict[str, Any]]:
+        """处理单个 Markdown 文件，应用类型转换、合并和默认值
+
+        parsed 为已解析的 (frontmatter, 正文起始字节偏移) 时直接使用，不再重新解析文件。
+        批量处理时使用本轮预先编译的 self.plan，单独调用时按参数临时编译。
+        """
         changes = []
+        self.last_write = None
+        self.last_failed = False
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            frontmatter, body = self.parse_frontmatter(content)
+            frontmatter, body_offset = parsed if parsed is not None else self._read_header(filepath)
             if not frontmatter:
                 self.log(f"{lang.get('invalid_frontmatter')}: {Path(filepath).name}", "warning")
                 return changes
             
-            new_frontmatter = frontmatter.copy()
-            
-            # 1. 应用合并规则
-            for target, sources in merge_map.items():
-                values = []
-                for src in sources:
-                    if src in new_frontmatter and new_frontmatter[src] is not None:
-                        val = new_frontmatter[src]
-                        if isinstance(val, list):
-                            values.extend(val)
-                        else:
-                            values.append(val)
-                if values:
-                    new_frontmatter[target] = values
-                    changes.append({
-                        'key': target, 'action': '合并',
-                        'old_value': frontmatter.get(target), 'new_value': values
-                    })
-                for src in sources:
-                    if src in new_frontmatter and src != target:
-                        del new_frontmatter[src]
-                        changes.append({
-                            'key': src, 'action': '删除',
-                            'old_value': frontmatter.get(src), 'new_value': None
-                        })
-            
-            # 2. 应用类型转换
-            for key, target_type in field_types.items():
-                if key in new_frontmatter and new_frontmatter[key] is not None:
-                    old_val = new_frontmatter[key]
-                    current_type = self.detect_type(old_val, list_separators)
-                    if current_type != target_type and (not ignore_null_conflicts or current_type != 'null'):
-                        try:
-                            new_frontmatter[key] = self.SUPPORTED_TYPES[target_type](old_val, list_separators)
-                            changes.append({
-                                'key': key, 'action': '类型转换',
-                                'old_value': old_val, 'new_value': new_frontmatter[key]
-                            })
-                        except (ValueError, TypeError) as e:
-                            self.log(f"文件 {Path(filepath).name} 字段 {key} 类型转换失败: {str(e)}", "warning")
-            
-            # 3. 应用默认值
-            for key, (val_type, default_val) in default_values.items():
-                if key not in new_frontmatter or new_frontmatter[key] is None:
-                    new_frontmatter[key] = default_val
-                    changes.append({
-                        'key': key, 'action': '填充默认值',
-                        'old_value': None, 'new_value': default_val
-                    })
+            plan = self.plan or TransformPlan(
+                self, merge_map, field_types, default_values, ignore_null_conflicts, list_separators
+            )
+            new_frontmatter, changes = self._transform(plan, filepath, frontmatter)
             
-            # 4. 保存修改后的文件
-            if changes and not overwrite:
-                output_file = Path(output_dir) / Path(filepath).relative_to(Path(input_dir))
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write('---\n')
-                    yaml.dump(new_frontmatter, f, allow_unicode=True, sort_keys=False)
-                    f.write('---\n')
-                    f.write(body)
-            elif changes and overwrite:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write('---\n')
-                    yaml.dump(new_frontmatter, f, allow_unicode=True, sort_keys=False)
-                    f.write('---\n')
-                    f.write(body)
+            # 保存修改后的文件
+            if changes:
+                self.last_write = self._write_file(filepath, input_dir or self.input_dir, output_dir,
+                                                   overwrite, new_frontmatter, body_offset)
             
             if thread:
                 thread.progress_updated.emit(1, Path(filepath).name)
             
         except Exception as e:
+            self.last_failed = True
             self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
         
         return changes
@@ -688,741 +1864,2085 @@ class FrontmatterAnalyzer:
     def process_directory(self, input_dir: str, output_dir: str, merge_map: Dict[str, List[str]], 
                      field_types: Dict[str, str], default_values: Dict[str, Tuple[str, Any]], 
                      ignore_null_conflicts: bool, overwrite: bool, 
-                     thread: Optional[QThread], lang: LanguageManager, 
-                     list_separators: List[str]) -> str:
-        """批量处理目录中的 Markdown 文件"""
-        self.analyze_files(input_dir, lang, list_separators)
+                     thread: Optional['QThread'], lang: LanguageManager, 
+                     list_separators: List[str], single_pass: bool = True,
+                     workers: int = 1, journal_dir: Optional[str] = None,
+                     checkpoint_path: Optional[str] = None, resume: bool = False,
+                     checkpoint_interval: int = 500, report_format: str = 'xlsx',
+                     engine: str = 'serial', io_threads: int = IO_THREADS,
+                     queue_size: int = PIPELINE_QUEUE_SIZE, concurrency: int = ASYNC_CONCURRENCY) -> str:
+        """批量处理目录中的 Markdown 文件
+
+        single_pass 为 True 时每个文件只读取和解析一次，解析结果同时用于
+        类型冲突统计和转换写入；为 False 时先完整分析再逐个处理。
+        workers 大于 1 时将文件分片交给进程池处理（始终为单遍模式）。
+        覆盖模式下指定 journal_dir 时，替换前的原始文件记录到写入日志中。
+        指定 checkpoint_path 时每隔 checkpoint_interval 个文件记录一次完成清单，
+        resume 为 True 时跳过清单中已完成的文件（始终为单遍模式）。
+        engine 为 'pipeline' 时（单进程）读取、解析转换、写入分为三个阶段重叠执行，
+        读取与写入各使用 io_threads 个线程，阶段之间最多 queue_size 个在途文件；
+        为 'async' 时用 asyncio 让最多 concurrency 个文件读写同时在途。
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"不支持的执行方式: {engine}（可选: {', '.join(ENGINES)}）")
+        workers = self._resolve_workers(workers)
+        if overwrite and journal_dir and workers <= 1:
+            self.journal = WriteJournal(journal_dir)
+        if checkpoint_path:
+            self.checkpoint = Checkpoint(checkpoint_path, input_dir, resume, checkpoint_interval)
+            single_pass = True
+        self.plan = TransformPlan(self, merge_map, field_types, default_values,
+                                  ignore_null_conflicts, list_separators)
+        if overwrite:
+            self.skip_dirs = [journal_dir] if journal_dir else []
+        else:
+            self.skip_dirs = [output_dir]
+        try:
+            if workers <= 1 and engine == 'pipeline':
+                self._process_pipeline(
+                    input_dir, output_dir, overwrite, thread, lang, list_separators,
+                    io_threads, queue_size
+                )
+            elif workers <= 1 and engine == 'async':
+                self._process_async(
+                    input_dir, output_dir, overwrite, thread, lang, list_separators, concurrency
+                )
+            else:
+                self._process_files(
+                    input_dir, output_dir, merge_map, field_types, default_values,
+                    ignore_null_conflicts, overwrite, thread, lang, list_separators,
+                    single_pass, workers, journal_dir
+                )
+        finally:
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+            if self.checkpoint:
+                self.checkpoint.close()
+                self.checkpoint = None
+            self.plan = None
+            self.skip_dirs = []
+        if self.resumed_files:
+            self.log(f"续传：跳过已完成的文件 {self.resumed_files} 个", "info")
+        
         if not self.valid_files:
             self.log(lang.get('no_valid_files'), "warning")
             return ""
         
-        processed_files = 0
-        for filepath in self.valid_files:
-            changes = self.process_file(
-                filepath, output_dir, merge_map, field_types, default_values,
-                ignore_null_conflicts, overwrite, thread, lang, list_separators
-            )
-            if changes:
-                processed_files += 1
-                self.log(f"{lang.get('file_processed').format(Path(filepath).name, len(changes))}", "info")
-            if thread:
-                thread.progress_updated.emit(processed_files, Path(filepath).name)
-        
-        report_path = self.generate_report(output_dir if not overwrite else input_dir)
+        report_path = self.generate_report(output_dir if not overwrite else input_dir, report_format)
         self.log(f"{lang.get('processing_complete').format(report_path)}", "info")
         return report_path
-    
-    def generate_report(self, report_dir: str) -> str:
-        """生成 Excel 格式的分析报告，修正输出路径"""
-        report_path = Path(report_dir) / 'frontmatter_analysis_report.xlsx'
-        report_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _process_files(self, input_dir: str, output_dir: str, merge_map: Dict[str, List[str]],
+                       field_types: Dict[str, str], default_values: Dict[str, Tuple[str, Any]],
+                       ignore_null_conflicts: bool, overwrite: bool, thread: Optional['QThread'],
+                       lang: LanguageManager, list_separators: List[str], single_pass: bool,
+                       workers: int, journal_dir: Optional[str]) -> int:
+        """按所选执行方式处理全部文件，返回有变更的文件数"""
+        if workers > 1:
+            processed_files = self._process_parallel(
+                input_dir, output_dir, merge_map, field_types, default_values,
+                ignore_null_conflicts, overwrite, thread, lang, list_separators, workers,
+                journal_dir
+            )
+        elif single_pass:
+            processed_files = self._process_single_pass(
+                input_dir, output_dir, merge_map, field_types, default_values,
+                ignore_null_conflicts, overwrite, thread, lang, list_separators
+            )
+        else:
+            self.analyze_files(input_dir, lang, list_separators)
+            self._emit_progress_range(thread, len(self.valid_files))
+            processed_files = 0
+            for filepath in self.valid_files:
+                changes = self.process_file(
+                    filepath, output_dir, merge_map, field_types, default_values,
+                    ignore_null_conflicts, overwrite, thread, lang, list_separators, input_dir
+                )
+                if changes:
+                    processed_files += 1
+                    self.log(f"{lang.get('file_processed').format(Path(filepath).name, len(changes))}", "info")
+                if thread:
+                    thread.progress_updated.emit(processed_files, Path(filepath).name)
+        return processed_files
+
+    def _process_parallel(self, input_dir: str, output_dir: str, merge_map: Dict[str, List[str]],
+                          field_types: Dict[str, str], default_values: Dict[str, Tuple[str, Any]],
+                          ignore_null_conflicts: bool, overwrite: bool, thread: Optional['QThread'],
+                          lang: LanguageManager, list_separators: List[str], workers: int,
+                          journal_dir: Optional[str] = None) -> int:
+        """多进程单遍处理，返回有变更的文件数；每个工作进程写各自的日志文件"""
+        self._begin_run(input_dir)
         
-        with pd.ExcelWriter(report_path, engine='xlsxwriter') as writer:
-            valid_files_df = pd.DataFrame({
-                "File Path": [str(Path(f).relative_to(report_path.parent)) for f in self.valid_files]
-            })
-            valid_files_df.to_excel(writer, sheet_name="Valid Files", index=False)
-            
-            conflict_data = []
-            for field, type_info in self.type_conflicts.items():
-                non_null_types = [t for t, f in type_info.items() if t != 'null' and f]
-                if len(non_null_types) > 1:
-                    for type_name, files in type_info.items():
-                        if not files:
-                            continue
-                        for file in files:
-                            conflict_data.append({
-                                "Field": field,
-                                "Type": type_name,
-                                "File": str(Path(file).relative_to(report_path.parent))
-                            })
-            if conflict_data:
-                conflict_df = pd.DataFrame(conflict_data)
-                conflict_df.to_excel(writer, sheet_name="Type Conflicts", index=False)
-            
-            stats_data = []
-            for field, type_info in self.type_conflicts.items():
-                stats_data.append({
-                    "Field": field,
-                    "Detected Types": ", ".join(sorted([t for t, f in type_info.items() if f])),
-                    "File Count": sum(len(files) for files in type_info.values())
-                })
-            stats_df = pd.DataFrame(stats_data)
-            stats_df.to_excel(writer, sheet_name="Field Statistics", index=False)
-        
-        return str(report_path)
+        input_path = Path(input_dir)
+        if not input_path.is_dir():
+            self.log(f"{lang.get('invalid_input_dir')} {input_dir}", "error")
+            return 0
+        
+        files = list(self._iter_markdown_files(input_path))
+        self._emit_progress_range(thread, len(files))
+        pending = [filepath for filepath in files if not self._resume_file(filepath)]
+        options = {
+            'input_dir': input_dir, 'output_dir': output_dir, 'merge_map': merge_map,
+            'field_types': field_types, 'default_values': default_values,
+            'ignore_null_conflicts': ignore_null_conflicts, 'overwrite': overwrite,
+            'lang': lang.lang, 'list_separators': list_separators, 'journal_dir': journal_dir,
+            'io_latency': self.io_latency, 'reader': self.reader
+        }
+        processed_files = self._run_sharded('process', pending, options, workers, thread, lang)
+        if self.resumed_files:
+            # 续传跳过的文件与新处理的文件分开记录，恢复为目录遍历顺序
+            order = {filepath: index for index, filepath in enumerate(files)}
+            self.valid_files.sort(key=order.__getitem__)
+        return processed_files
 
-# ====================
-# 主界面类
-# ====================
+    def _resume_file(self, filepath: str) -> bool:
+        """续传时检查文件是否已在清单中完成；已完成则恢复其字段类型并返回 True"""
+        if not self.checkpoint:
+            return False
+        done, field_types = self.checkpoint.lookup(filepath)
+        if done:
+            self._record_resumed(filepath, field_types)
+        return done
 
-class MainWindow(QMainWindow):
-    def __init__(self, lang: LanguageManager = None):
-        super().__init__()
-        self.lang = lang if lang else LanguageManager('zh')  # 默认中文
-        self.setWindowTitle(self.lang.get('window_title'))
-        self.setMinimumSize(1000, 800)
+    def _process_single_pass(self, input_dir: str, output_dir: str, merge_map: Dict[str, List[str]],
+                             field_types: Dict[str, str], default_values: Dict[str, Tuple[str, Any]],
+                             ignore_null_conflicts: bool, overwrite: bool, thread: Optional['QThread'],
+                             lang: LanguageManager, list_separators: List[str]) -> int:
+        """单遍流水线：读取、解析、统计、转换、写入一次完成，返回有变更的文件数"""
+        self._begin_run(input_dir)
         
-        self.analyzer = FrontmatterAnalyzer()
-        self.analyzer.log_callback = self.log_message
-        self.current_report = None
-        self.processing_thread = None
-        self.list_separators = [',', ';', '|']  # 默认列表分隔符
+        input_path = Path(input_dir)
+        if not input_path.is_dir():
+            self.log(f"{lang.get('invalid_input_dir')} {input_dir}", "error")
+            return 0
         
-        self.init_ui()
+        processed_files = 0
+        files = self._iter_markdown_files(input_path)
+        total = 0
+        for filepath in files:
+            if thread and files.found != total:
+                # 遍历与处理同时进行，进度范围随已发现的文件数增长
+                total = files.found
+                self._emit_progress_range(thread, total)
+            if self._resume_file(filepath):
+                continue
+            try:
+                frontmatter, body_offset = self._read_header(filepath)
+            except Exception as e:
+                self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
+                continue
+            if not frontmatter:
+                self._checkpoint_done(filepath, None, 0, None)
+                continue
+            
+            detected = self._detect_types(frontmatter, list_separators)
+            self._record_types(filepath, detected)
+            changes = self.process_file(
+                filepath, output_dir, merge_map, field_types, default_values,
+                ignore_null_conflicts, overwrite, thread, lang, list_separators, input_dir,
+                parsed=(frontmatter, body_offset)
+            )
+            if not self.last_failed:
+                self._checkpoint_done(filepath, detected, len(changes), self.last_write)
+            if changes:
+                processed_files += 1
+                self.log(f"{lang.get('file_processed').format(Path(filepath).name, len(changes))}", "info")
+            if thread:
+                thread.progress_updated.emit(processed_files, Path(filepath).name)
+        return processed_files
     
-    def init_ui(self):
-        """初始化图形用户界面"""
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QVBoxLayout(central_widget)
-        
-        # 文件路径配置区域
-        path_group = QWidget()
-        path_layout = QFormLayout(path_group)
-        
-        self.input_dir_edit = QLineEdit()
-        input_browse_btn = QPushButton(self.lang.get('browse'))
-        input_browse_btn.clicked.connect(self.browse_input_dir)
-        input_layout = QHBoxLayout()
-        input_layout.addWidget(self.input_dir_edit)
-        input_layout.addWidget(input_browse_btn)
-        path_layout.addRow(self.lang.get('input_dir'), input_layout)
-        
-        self.output_dir_edit = QLineEdit()
-        output_browse_btn = QPushButton(self.lang.get('browse'))
-        output_browse_btn.clicked.connect(self.browse_output_dir)
-        output_layout = QHBoxLayout()
-        output_layout.addWidget(self.output_dir_edit)
-        output_layout.addWidget(output_browse_btn)
-        path_layout.addRow(self.lang.get('output_dir'), output_layout)
-        
-        # 语言与选项组
-        options_group = QWidget()
-        options_layout = QHBoxLayout(options_group)
-        
-        self.language_combo = QComboBox()
-        self.language_combo.addItems(['English', '中文', 'Français', 'Español', 'العربية', 'Русский'])
-        self.language_combo.setCurrentText('中文')
-        self.language_combo.currentIndexChanged.connect(self.change_language)
-        options_layout.addWidget(QLabel(self.lang.get('language')))
-        options_layout.addWidget(self.language_combo)
-        
-        self.overwrite_check = QCheckBox(self.lang.get('overwrite'))
-        self.overwrite_check.stateChanged.connect(self.toggle_output_dir)
-        options_layout.addWidget(self.overwrite_check)
-        
-        self.ignore_null_check = QCheckBox(self.lang.get('ignore_null'))
-        options_layout.addWidget(self.ignore_null_check)
-        
-        # 配置选项区域
-        config_group = QWidget()
-        config_layout = QFormLayout(config_group)
-        
-        self.config_edit = QLineEdit("frontmatter_config.yaml")
-        config_browse_btn = QPushButton(self.lang.get('browse'))
-        config_browse_btn.clicked.connect(self.browse_config)
-        config_btn_layout = QHBoxLayout()
-        config_btn_layout.addWidget(self.config_edit)
-        config_btn_layout.addWidget(config_browse_btn)
-        config_layout.addRow(self.lang.get('config_file'), config_btn_layout)
-        
-        # 主选项卡
-        self.tab_widget = QTabWidget()
-        
-        self.field_type_tab = QWidget()
-        self.init_field_type_tab()
-        self.tab_widget.addTab(self.field_type_tab, self.lang.get('field_types'))
-        
-        self.merge_tab = QWidget()
-        self.init_merge_tab()
-        self.tab_widget.addTab(self.merge_tab, self.lang.get('merge_rules'))
+    def _transform_block(self, filepath: str, text: Optional[str], list_separators: List[str]):
+        """解析已读取的 frontmatter 文本、记录字段类型并应用本轮转换计划
+
+        返回 (字段类型, 新 frontmatter, 变更列表)；没有有效 frontmatter 时返回 None。
+        """
+        if text is None:
+            self.log('invalid_frontmatter', "warning")
+            return None
+        frontmatter = self._parse_block(filepath, text)
+        if not frontmatter:
+            return None
+        detected = self._detect_types(frontmatter, list_separators)
+        self._record_types(filepath, detected)
+        return (detected,) + self._transform(self.plan, filepath, frontmatter)
+
+    def _checkpoint_done(self, filepath: str, detected: Optional[Dict[str, str]], changes: int,
+                         written: Optional[Tuple[str, str]]):
+        """在续传清单中记录已完成的文件；YAML 解析失败的文件不记录，续传时重新处理并再次报告错误"""
+        if self.checkpoint and filepath not in self.parse_failures:
+            self.checkpoint.add(filepath, detected, changes, written)
+
+    def _finish_file(self, filepath: str, detected: Optional[Dict[str, str]], changes: List[Dict[str, Any]],
+                     written: Optional[Tuple[str, str]], lang: LanguageManager) -> bool:
+        """文件写入完成后记录清单与日志，返回文件是否有变更"""
+        self._checkpoint_done(filepath, detected, len(changes), written)
+        if changes:
+            self.log(f"{lang.get('file_processed').format(Path(filepath).name, len(changes))}", "info")
+        return bool(changes)
+
+    def _resume_lookup(self, files: Iterable[str]):
+        """逐个查询续传清单，产出 (路径, 是否已完成, 清单中的字段类型)
+
+        只查询不记录：读取阶段领先于消费方，已完成文件的记录留给调用方按目录顺序进行。
+        """
+        for filepath in files:
+            done, field_types = self.checkpoint.lookup(filepath) if self.checkpoint else (False, None)
+            yield filepath, done, field_types
+
+    def _read_unless_done(self, entry: Tuple[str, bool, Any]) -> Optional[Tuple[Optional[str], int]]:
+        """读取阶段：续传清单中已完成的文件不再读取，返回 None"""
+        filepath, done, _ = entry
+        return None if done else self._read_block(filepath)
+
+    def _record_resumed(self, filepath: str, field_types: Optional[Dict[str, str]]):
+        """记录续传时跳过的文件，其字段类型从清单中恢复"""
+        self.resumed_files += 1
+        self._record_result(filepath, field_types)
+
+    def _process_pipeline(self, input_dir: str, output_dir: str, overwrite: bool,
+                          thread: Optional['QThread'], lang: LanguageManager, list_separators: List[str],
+                          io_threads: int, queue_size: int) -> int:
+        """流水线单遍处理，返回有变更的文件数
+
+        读取线程只读取 frontmatter 字节，解析、类型统计与转换在调用方线程中按
+        目录顺序执行（分析器状态无需加锁），写入线程负责临时文件、fsync 与原子
+        替换。完成记录（清单、日志、进度）同样按目录顺序在调用方线程中进行。
+        """
+        self._begin_run(input_dir)
         
-        self.defaults_tab = QWidget()
-        self.init_defaults_tab()
-        self.tab_widget.addTab(self.defaults_tab, self.lang.get('default_values'))
+        input_path = Path(input_dir)
+        if not input_path.is_dir():
+            self.log(f"{lang.get('invalid_input_dir')} {input_dir}", "error")
+            return 0
+        
+        reader = PipelineStage('read', io_threads, queue_size)
+        transformer = PipelineStage('transform')
+        writer = PipelineStage('write', io_threads, queue_size)
+        self.stages = [reader, transformer, writer]
+        files = self._iter_markdown_files(input_path)
+        
+        def transformed():
+            for (filepath, done, resumed_types), block, error in reader.map(self._read_unless_done,
+                                                                            self._resume_lookup(files)):
+                if done:
+                    self._record_resumed(filepath, resumed_types)
+                    continue
+                if error is not None:
+                    self.log(f"处理文件 {Path(filepath).name} 失败: {str(error)}", "error")
+                    continue
+                text, body_offset = block
+                try:
+                    result = transformer.call(self._transform_block, filepath, text, list_separators)
+                except Exception as e:
+                    self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
+                    continue
+                if result is None:
+                    self._checkpoint_done(filepath, None, 0, None)
+                    continue
+                detected, new_frontmatter, changes = result
+                yield filepath, detected, changes, new_frontmatter, body_offset
         
-        # 检测结果区域
-        self.results_table = QTableWidget(0, 3)
-        self.results_table.setHorizontalHeaderLabels([
-            self.lang.get('field_name'), self.lang.get('type'), "Files"
-        ])
-        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        def write(job):
+            filepath, _, changes, new_frontmatter, body_offset = job
+            if not changes:
+                return None
+            return self._write_file(filepath, input_dir, output_dir, overwrite, new_frontmatter, body_offset)
         
-        # 日志区域
-        self.log_area = QTextEdit()
-        self.log_area.setReadOnly(True)
+        processed_files = 0
+        total = 0
+        for job, written, error in writer.map(write, transformed()):
+            filepath, detected, changes = job[:3]
+            if error is not None:
+                self.log(f"处理文件 {Path(filepath).name} 失败: {str(error)}", "error")
+                continue
+            if self._finish_file(filepath, detected, changes, written, lang):
+                processed_files += 1
+            if thread:
+                if files.found != total:
+                    total = files.found
+                    self._emit_progress_range(thread, total)
+                thread.progress_updated.emit(processed_files, Path(filepath).name)
         
-        # 进度条
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setVisible(False)
+        for stage in self.stages:
+            self.log(f"流水线阶段 {stage.name}: {stage.items} 个文件，失败 {stage.errors}，"
+                     f"工作 {stage.busy:.2f}s，等待 {stage.waited:.2f}s，最大在途 {stage.max_depth}", "info")
+        return processed_files
+
+    async def _aread_blocks(self, files: Iterable[Any], io: Callable, limit: int, read: Optional[Callable] = None):
+        """按顺序异步产出 (条目, read(条目) 的结果, 异常)，最多 limit 个读取同时在途
+
+        read 默认为 _read_block，条目为文件路径，结果为 (文本, 偏移)。文件列表的迭代
+        （目录遍历、续传查询）放到默认线程池中执行，不阻塞事件循环。
+        """
+        import asyncio
+        from collections import deque
+        loop = asyncio.get_running_loop()
+        read = read or self._read_block
+        iterator = iter(files)
+        done = object()
+        reads = deque()
+        exhausted = False
+        while True:
+            while not exhausted and len(reads) < limit:
+                item = await loop.run_in_executor(None, next, iterator, done)
+                if item is done:
+                    exhausted = True
+                    break
+                reads.append((item, asyncio.ensure_future(io(read, item))))
+            if not reads:
+                return
+            item, task = reads.popleft()
+            try:
+                yield item, await task, None
+            except Exception as e:
+                yield item, None, e
+
+    def _run_async(self, worker: Callable, concurrency: int) -> Any:
+        """运行 async 方式的主协程：worker(io) 中的 io(func, *args) 在线程池中执行阻塞的文件操作，
+        同时在途的操作数不超过 concurrency"""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        concurrency = max(1, concurrency)
+        
+        async def main():
+            loop = asyncio.get_running_loop()
+            limiter = asyncio.Semaphore(concurrency)
+            
+            async def io(func: Callable, *args):
+                async with limiter:
+                    return await loop.run_in_executor(executor, func, *args)
+            return await worker(io)
         
-        # 按钮区域
-        button_group = QWidget()
-        button_layout = QHBoxLayout(button_group)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return asyncio.run(main())
+
+    def _process_async(self, input_dir: str, output_dir: str, overwrite: bool,
+                       thread: Optional['QThread'], lang: LanguageManager, list_separators: List[str],
+                       concurrency: int) -> int:
+        """asyncio 单遍处理，返回有变更的文件数
+
+        最多 concurrency 个文件读写同时在途，适合单次打开/读取延迟高的网络文件系统；
+        解析、类型统计、转换和完成记录仍在事件循环线程中按目录顺序执行。
+        """
+        import asyncio
+        self._begin_run(input_dir)
         
-        analyze_btn = QPushButton(self.lang.get('analyze'))
-        analyze_btn.clicked.connect(self.run_analysis)
-        button_layout.addWidget(analyze_btn)
+        input_path = Path(input_dir)
+        if not input_path.is_dir():
+            self.log(f"{lang.get('invalid_input_dir')} {input_dir}", "error")
+            return 0
         
-        process_btn = QPushButton(self.lang.get('process'))
-        process_btn.clicked.connect(self.start_processing)
-        button_layout.addWidget(process_btn)
+        files = self._iter_markdown_files(input_path)
+        limit = max(1, concurrency)
         
-        report_btn = QPushButton(self.lang.get('view_report'))
-        report_btn.clicked.connect(self.open_report)
-        button_layout.addWidget(report_btn)
+        async def worker(io):
+            from collections import deque
+            processed_files = 0
+            total = 0
+            writes = deque()
+            
+            async def finish(filepath, detected, changes, task):
+                nonlocal processed_files, total
+                written = None
+                if task is not None:
+                    try:
+                        written = await task
+                    except Exception as e:
+                        self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
+                        return
+                if self._finish_file(filepath, detected, changes, written, lang):
+                    processed_files += 1
+                if thread:
+                    if files.found != total:
+                        total = files.found
+                        self._emit_progress_range(thread, total)
+                    thread.progress_updated.emit(processed_files, Path(filepath).name)
+            
+            async for (filepath, done, resumed_types), block, error in self._aread_blocks(
+                    self._resume_lookup(files), io, limit, self._read_unless_done):
+                if done:
+                    self._record_resumed(filepath, resumed_types)
+                    continue
+                if error is not None:
+                    self.log(f"处理文件 {Path(filepath).name} 失败: {str(error)}", "error")
+                    continue
+                text, body_offset = block
+                try:
+                    result = self._transform_block(filepath, text, list_separators)
+                except Exception as e:
+                    self.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
+                    continue
+                if result is None:
+                    self._checkpoint_done(filepath, None, 0, None)
+                    continue
+                detected, new_frontmatter, changes = result
+                task = None
+                if changes:
+                    task = asyncio.ensure_future(io(
+                        self._write_file, filepath, input_dir, output_dir, overwrite, new_frontmatter, body_offset
+                    ))
+                writes.append((filepath, detected, changes, task))
+                # 按顺序完成已结束的写入；在途写入超过上限时等待最早的一个
+                while writes and (len(writes) > limit or writes[0][3] is None or writes[0][3].done()):
+                    await finish(*writes.popleft())
+            while writes:
+                await finish(*writes.popleft())
+            return processed_files
+        
+        return self._run_async(worker, concurrency)
+
+    def run_metrics(self, **labels: Any) -> Dict[str, Any]:
+        """本轮运行的结构化统计摘要（JSON 可序列化），labels 作为附加字段"""
+        self._sync_metrics()
+        return self.metrics.summary(**labels)
+
+    def write_prometheus(self, path: str, **labels: Any):
+        """以 Prometheus textfile 格式写出本轮运行的统计，labels 作为指标标签"""
+        self._sync_metrics()
+        self.metrics.write_prometheus(path, **labels)
+
+    def _sync_metrics(self):
+        """将运行结果的汇总值写入计数器"""
+        metrics = self.metrics
+        metrics.set('valid_files', len(self.valid_files))
+        metrics.set('fields', len(self.type_conflicts))
+        metrics.set('type_conflicts', len(self._conflict_fields()))
+        metrics.set('writes_skipped', self.writes_skipped)
+        metrics.set('resumed_files', self.resumed_files)
+        for name, value in self.cache_stats.items():
+            metrics.set(f"cache_{name}", value)
+        for name, memo in (('type_memo', self.type_memo), ('convert_memo', self.convert_memo)):
+            hits, misses = memo.stats()
+            metrics.set(f"{name}_hits", hits)
+            metrics.set(f"{name}_misses", misses)
+
+    def _report_relpath(self, filepath: str, report_dir: Path) -> str:
+        """报告中的文件路径：优先相对于报告目录，其次相对于输入目录"""
+        for base in (report_dir, self.input_dir):
+            if base is None:
+                continue
+            try:
+                return str(Path(filepath).relative_to(base))
+            except ValueError:
+                continue
+        return str(filepath)
+
+    def _run_info(self) -> List[Tuple[str, Any]]:
+        """报告中“运行信息”工作表的键值对"""
+        info = [
+            ("YAML Backend", YAML_BACKEND),
+            ("Valid Files", len(self.valid_files)),
+            ("Fields", len(self.type_conflicts)),
+            ("Writes Skipped", self.writes_skipped),
+            ("Resumed Files", self.resumed_files),
+        ]
+        info += self._memo_info("Type Memo", self.type_memo)
+        info += self._memo_info("Convert Memo", self.convert_memo)
+        info += [(f"Cache {name.title()}", value) for name, value in self.cache_stats.items()]
+        for stage in self.stages:
+            info += stage.summary()
+        return info
+
+    @staticmethod
+    def _memo_info(label: str, memo: LRUMemo) -> List[Tuple[str, Any]]:
+        """记忆表的命中次数、未命中次数与命中率"""
+        hits, misses = memo.stats()
+        rate = f"{hits / (hits + misses):.1%}" if hits + misses else "-"
+        return [(f"{label} Hits", hits), (f"{label} Misses", misses), (f"{label} Hit Rate", rate)]
+
+    def _conflict_fields(self) -> List[str]:
+        """存在多于一种非 null 类型的字段"""
+        return [
+            field for field, type_info in self.type_conflicts.items()
+            if len([t for t, f in type_info.items() if t != 'null' and f]) > 1
+        ]
+    
+    def _report_datasets(self, report_dir: Path) -> List[Tuple[str, Tuple[str, ...], Iterable[tuple]]]:
+        """报告的各个数据集：(名称, 列名, 逐行生成器)；行在写出时才生成"""
+        relpath = self._report_relpath
         
-        main_layout.addWidget(path_group)
-        main_layout.addWidget(options_group)
-        main_layout.addWidget(config_group)
-        main_layout.addWidget(self.tab_widget)
-        main_layout.addWidget(self.results_table)
-        main_layout.addWidget(self.progress_bar)
-        main_layout.addWidget(self.log_area)
-        main_layout.addWidget(button_group)
-    
-    def init_field_type_tab(self):
-        """初始化字段类型配置选项卡"""
-        layout = QVBoxLayout(self.field_type_tab)
+        def valid_rows():
+            for f in self.valid_files:
+                yield (relpath(f, report_dir),)
         
-        self.field_table = QTableWidget(0, 2)
-        self.field_table.setHorizontalHeaderLabels([self.lang.get('field_name'), self.lang.get('target_type')])
-        self.field_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        def conflict_rows(fields):
+            for field in fields:
+                for type_name, files in self.type_conflicts[field].items():
+                    for file in files:
+                        yield (field, type_name, relpath(file, report_dir))
         
-        add_row_btn = QPushButton(self.lang.get('add_field'))
-        add_row_btn.clicked.connect(self.add_field_row)
+        def stats_rows():
+            for field, type_info in self.type_conflicts.items():
+                yield (
+                    field,
+                    ", ".join(sorted([t for t, f in type_info.items() if f])),
+                    sum(len(files) for files in type_info.values()),
+                )
         
-        layout.addWidget(self.field_table)
-        layout.addWidget(add_row_btn)
+        datasets = [("Valid Files", ("File Path",), valid_rows())]
+        conflict_fields = self._conflict_fields()
+        if conflict_fields:
+            datasets.append(("Type Conflicts", ("Field", "Type", "File"), conflict_rows(conflict_fields)))
+        datasets.append(("Field Statistics", ("Field", "Detected Types", "File Count"), stats_rows()))
+        datasets.append(("Run Info", ("Key", "Value"), iter(self._run_info())))
+        return datasets
     
-    def init_merge_tab(self):
-        """初始化合并规则选项卡"""
-        layout = QVBoxLayout(self.merge_tab)
-        
-        self.merge_table = QTableWidget(0, 2)
-        self.merge_table.setHorizontalHeaderLabels([self.lang.get('target_field'), self.lang.get('source_fields')])
-        self.merge_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
-        add_row_btn = QPushButton(self.lang.get('add_rule'))
-        add_row_btn.clicked.connect(self.add_merge_row)
-        
-        layout.addWidget(self.merge_table)
-        layout.addWidget(add_row_btn)
+    def generate_report(self, report_dir: str, report_format: str = 'xlsx') -> str:
+        """生成分析报告并返回其路径
+
+        xlsx 格式逐行流式写入单个工作簿，超过行数上限的工作表自动拆分；
+        csv（gzip）、jsonl 和 parquet 格式在报告目录下为每个数据集写一个文件。
+        """
+        writer_class = REPORT_WRITERS.get(report_format)
+        if writer_class is None:
+            raise ValueError(f"不支持的报告格式: {report_format}（可选: {', '.join(REPORT_FORMATS)}）")
+        start = self.metrics.clock()
+        report_dir = Path(report_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        
+        with writer_class(report_dir) as writer:
+            for name, columns, rows in self._report_datasets(report_dir):
+                rows_written = writer.write_sheet(name, columns, rows)
+                self.metrics.count('report_rows', rows_written)
+        
+        self.metrics.add_time('report', self.metrics.clock() - start)
+        return str(writer.path)
+
+
+class TransformPlan:
+    """由合并规则、字段类型和默认值编译出的转换计划
+
+    配置只解释一次：每条规则编译为一个小的步骤函数，分隔符和转换函数预先
+    绑定，之后每个文件只需按顺序执行步骤（合并 → 类型转换 → 默认值），
+    且只处理实际存在的字段。
+    """
     
-    def init_defaults_tab(self):
-        """初始化默认值选项卡"""
-        layout = QVBoxLayout(self.defaults_tab)
-        
-        self.defaults_table = QTableWidget(0, 3)
-        self.defaults_table.setHorizontalHeaderLabels([
-            self.lang.get('field_name'), self.lang.get('type'), self.lang.get('default_value')
-        ])
-        self.defaults_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
-        add_row_btn = QPushButton(self.lang.get('add_default'))
-        add_row_btn.clicked.connect(self.add_default_row)
-        
-        layout.addWidget(self.defaults_table)
-        layout.addWidget(add_row_btn)
+    def __init__(self, analyzer: FrontmatterAnalyzer, merge_map: Dict[str, List[str]],
+                 field_types: Dict[str, str], default_values: Dict[str, Tuple[str, Any]],
+                 ignore_null_conflicts: bool, list_separators: List[str]):
+        self.analyzer = analyzer
+        self.ignore_null_conflicts = ignore_null_conflicts
+        self.matcher = SeparatorMatcher.for_separators(list_separators)
+        self.steps = [self._compile_merge(target, sources) for target, sources in merge_map.items()]
+        for key, target_type in field_types.items():
+            converter = self._compile_converter(target_type)
+            if converter is None:
+                analyzer.log(f"字段 {key} 的目标类型 {target_type} 不受支持，已忽略该规则", "warning")
+                continue
+            self.steps.append(self._compile_conversion(key, target_type, self._memoize(target_type, converter)))
+        if default_values:
+            self.steps.append(self._compile_defaults(default_values))
     
-    def add_field_row(self):
-        """添加字段类型配置行"""
-        row = self.field_table.rowCount()
-        self.field_table.insertRow(row)
-        
-        type_combo = QComboBox()
-        type_combo.addItems([
-            self.lang.get_type_display('str'), self.lang.get_type_display('int'),
-            self.lang.get_type_display('float'), self.lang.get_type_display('bool'),
-            self.lang.get_type_display('date'), self.lang.get_type_display('datetime'),
-            self.lang.get_type_display('list')
-        ])
-        type_combo.setItemData(0, 'str', Qt.ItemDataRole.UserRole)
-        type_combo.setItemData(1, 'int', Qt.ItemDataRole.UserRole)
-        type_combo.setItemData(2, 'float', Qt.ItemDataRole.UserRole)
-        type_combo.setItemData(3, 'bool', Qt.ItemDataRole.UserRole)
-        type_combo.setItemData(4, 'date', Qt.ItemDataRole.UserRole)
-        type_combo.setItemData(5, 'datetime', Qt.ItemDataRole.UserRole)
-        type_combo.setItemData(6, 'list', Qt.ItemDataRole.UserRole)
-        self.field_table.setCellWidget(row, 1, type_combo)
-    
-    def add_merge_row(self):
-        """添加合并规则行"""
-        row = self.merge_table.rowCount()
-        self.merge_table.insertRow(row)
-    
-    def add_default_row(self):
-        """添加默认值规则行"""
-        row = self.defaults_table.rowCount()
-        self.defaults_table.insertRow(row)
-        
-        type_combo = QComboBox()
-        type_combo = ['add_items']
-        for type_name in ['str', 'int', 'float', 'bool', 'date', 'datetime', 'list']:
-            type_combo.addItem(self.lang.get_type_display(type_name))
-            type_combo.setItemData(type_combo.count() - 1, type_name, Qt.ItemDataRole.UserRole)
-        self.defaults_table.setCellWidget(row, 1, type_combo)
-    
-    def browse_input_dir(self):
-        """浏览并选择输入目录"""
-        dir_path = QFileDialog.getExistingDirectory(self, self.lang.get('input_dir'))
-        if dir_path:
-            self.input_dir_edit.setText(dir_path)
-            if not self.output_dir_edit.text() and not self.overwrite_check.isChecked():
-                self.output_dir_edit.setText(str(Path(dir_path) / 'output'))
-    
-    def browse_output_dir(self):
-        """浏览并选择输出目录"""
-        dir_path = QFileDialog.getExistingDirectory(self, self.lang.get('output_dir'))
-        if dir_path:
-            self.output_dir_edit.setText(dir_path)
-    
-    def browse_config(self):
-        """浏览并选择配置文件"""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, self.lang.get('config_file'), filter="YAML Files (*.yaml *.yml)")
-        
-        if file_path:
-            self.config_edit.setText(file_path)
-            self.load_config()
-    
-    def toggle_output_dir(self):
-        """切换覆盖模式时控制输出目录输入框启用状态"""
-        self.output_dir_edit.setEnabled(not self.overwrite_check.isChecked())
-    
-    def change_language(self, index):
-        """动态切换语言"""
-        lang_map = {
-            'English': 'en'
-            , '中文': 'zh'
-            , 'Français': 'fr'
-            , 'es':'es'
-            , 'العربية': 'ar'
-            , 'Русский': 'ru'
-        }
-        new_lang = lang_map[self.language_combo.itemText(index)]
-        self.lang = LanguageManager(new_lang)
-        self.update_ui_texts()
+    def _compile_converter(self, target_type: str) -> Optional[Callable[[Any], Any]]:
+        """取得目标类型的转换函数，列表转换预先绑定分隔符"""
+        if target_type == 'list':
+            matcher = self.matcher
+            return lambda v: FrontmatterAnalyzer._convert_to_list(v, matcher)
+        return FrontmatterAnalyzer.SUPPORTED_TYPES.get(target_type)
     
-    def update_ui_texts(self):
-        """更新界面文本以反映当前语言"""
-        self.setWindowTitle(self.lang.get('window_title'))
-        
-        # 更新路径标签
-        path_group = self.centralWidget().layout().itemAt(0).widget()
-        path_layout = path_group.layout()
-        path_layout.itemAt(0).labelItem().setText(self.lang.get('input_dir'))
-        path_layout.itemAt(1).layout().itemAt(1).widget().setText(self.lang.get('browse'))
-        path_layout.itemAt(1).labelItem().setText(self.lang.get('output_dir'))
-        path_layout.itemAt(1).layout().itemAt(1).widget().setText(self.lang.get('browse'))
-        
-        # 更新选项组
-        options_group = self.centralWidget().layout().itemAt(1).widget()
-        options_layout = options_group.layout()
-        options_layout.itemAt(0).widget().setText(self.lang.get('language'))
-        self.overwrite_check.setText(self.lang.get('overwrite'))
-        self.ignore_null_check.setText(self.lang.get('ignore_null'))
-        
-        # 更新配置文件区域
-        config_group = self.centralWidget().layout().itemAt(2).widget()
-        config_layout = config_group.layout()
-        config_layout.itemAt(0).labelItem().setText(self.lang.get('config_file'))
-        config_layout.itemAt(layout(0)).itemAt(1).widget().setText(self.lang.get('browse'))
-        
-        # 更新选项卡
-        self.tab_widget.setTabText(0, self.lang.get('field_types'))
-        self.tab_widget.setTabText(1, self.lang.get('merge_rules'))
-        self.tab_widget.setTabText(2, self.lang.get('default_values'))
-        
-        self.field_table.setHorizontalHeaderLabels([self.lang.get("field_name"), self.lang.get("target_type")])
-        self.merge_table.setHorizontalHeaderLabels([self.lang.get("target_field"), self.lang.get("source_fields")])
-        self.defaults_table.setHorizontalHeaderLabels([
-            self.lang.get('field_name'), self.lang.get('type'), self.lang.get('default_value')
-        ])
-        self.results_table.setHorizontalHeaderLabels([
-            self.lang.get('field_name'), self.lang.get('type'), 'Files'
-        ])
-        
-        # 更新按钮
-        button_group = self.centralWidget().layout().itemAt(6).widget()
-        button_layout = button_group.layout()
-        button_layout.itemAt(0).widget().setText(self.lang.get('analyze'))
-        button_layout.itemAt(1).widget().setText(self.lang.get('process_button'))
-        button_layout.itemAt(2).widget().setText(self.lang.get('view_report'))
-    
-    def load_config(self):
-        """从 YAML 文件加载配置"""
-        config_path = self.config_edit.text()
-        if not config_path or not os.path.exists(config_path):
-            self.log_message(self.lang.get('config_not_found').format(config_path), "warning")
-            return
-        
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f) or {}
-            
-            # 加载语言设置
-            if 'language' in config:
-                lang_map = {
-                    'en': 'English', 'zh': '中文', 'fr': 'Français',
-                    'es': 'Español', 'ar': 'العربية', 'ru': 'Русский'
-                }
-                if config['language'] in lang_map:
-                    self.language_combo.setCurrentText(lang_map[config['language']])
-                    self.change_language(self.language_combo.currentIndex())
-            
-            # 加载列表分隔符
-            if 'list_separators' in config:
-                self.list_separators = config['list_separators']
-            
-            # 加载字段类型
-            self.field_table.setRowCount(0)
-            for field, field_type in config.get('field_types', {}).items():
-                row = self.field_table.rowCount()
-                self.field_table.insertRow(row)
-                self.field_table.setRowItem(row, 0, QTableWidgetItem(field))
-                combo = QComboBox()
-                combo.addItems([
-                    self.lang.get_type_display('str'), self.lang.get_type_display('int'),
-                    self.lang.get_type_display('float'), self.lang.get_type_display('bool'),
-                    self.lang.get_type_display('date'), self.lang.get_type_display('datetime'),
-                    self.lang.get_type_display('list')
-                ])
-                combo.setItemData(0, 'str', Qt.ItemDataRole.UserRole)
-                combo.setItemData(1, 'int', Qt.ItemDataRole.UserRole)
-                combo.setItemData(2, 'float', Qt.ItemDataRole.UserRole)
-                combo.setItemData(3, 'bool', Qt.ItemDataRole.UserRole)
-                combo.setItemData(4, 'date', Qt.ItemDataRole.UserRole)
-                combo.setItemData(5, 'datetime', Qt.ItemDataRole.UserRole)
-                combo.setItemData(6, 'list', Qt.ItemDataRole.UserRole)
-                if field_type in FrontmatterAnalyzer.SUPPORTED_TYPES:
-                    combo.setCurrentText(self.lang.get_type_display(field_type))
-                self.field_table.setCellWidget(row, 1, combo)
-            
-            # 加载合并规则
-            self.merge_table.setRowCount(0)
-            for target, sources in config.get('merge_rules', {}).items():
-                row = self.merge_table.rowCount()
-                self.merge_table.insertRow(row)
-                self.merge_table.setItem(row, 0, QTableWidgetItem(target))
-                self.merge_table.setItem(row, 1, QTableWidgetItem(",".join(sources)))
-            
-            # 加载默认值
-            self.defaults_table.setRowCount(0)
-            for field, value_info in config.get('default_values', {}).items():
-                row = self.defaults_table.rowCount()
-                self.defaults_table.insertRow(row)
-                self.defaults_table.setItem(row, 0, QTableWidgetItem(field))
-                
-                combo = QComboBox()
-                combo.addItems([
-                    self.lang.get_type_display('str'), self.lang.get_type_display('int'),
-                    self.lang.get_type_display('float'), self.lang.get_type_display('bool'),
-                    self.lang.get_type_display('date'), self.lang.get_type_display('datetime'),
-                    self.lang.get_type_display('list')
-                ])
-                combo.setItemData(0, 'str', Qt.ItemDataRole.UserRole)
-                combo.setItemData(1, 'int', Qt.ItemDataRole.UserRole)
-                combo.setItemData(2, 'float', Qt.ItemDataRole.UserRole)
-                combo.setItemData(3, 'bool', Qt.ItemDataRole.UserRole)
-                combo.setItemData(4, 'date', Qt.ItemDataRole.UserRole)
-                combo.setItemData(5, 'datetime', Qt.ItemDataRole.UserRole)
-                combo.setItemData(6, 'list', Qt.ItemDataRole.UserRole)
-                
-                value_type = value_info.get('type', 'str')
-                combo.setCurrentText(self.lang.get_type_display(value_type))
-                self.defaults_table.setCellWidget(row, 1, combo)
-                self.defaults_table.setItem(row, 2, QTableWidgetItem(str(value_info.get('value', ''))))
-            
-            self.log_message(self.lang.get('config_saved').format(config_path), "info")
-        except Exception as e:
-            self.log_message(self.lang.get('config_load_failed').format(str(e)), "error")
+    def _memoize(self, target_type: str, converter: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """为标量值的转换结果加记忆表，键为 (值类型, 值, 目标类型, 分隔符匹配器)；列表结果返回副本
+
+        日期/时间结果不记忆：PyYAML 按对象身份识别别名，同一个对象写入多个字段会被
+        序列化为 &id001 / *id001。
+        """
+        if target_type in ('date', 'datetime'):
+            return converter
+        memo = self.analyzer.convert_memo
+        matcher = self.matcher
+        
+        def convert(value):
+            value_type = type(value)
+            if value_type not in MEMO_SCALAR_TYPES:
+                return converter(value)
+            result = memo.get((value_type, value, target_type, matcher), lambda: converter(value))
+            return list(result) if isinstance(result, list) else result
+        return convert
     
-    def save_config(self):
-        """保存当前配置到 YAML 文件，包括语言和分隔符设置"""
-        config_path = self.config_edit.text()
-        if not config_path:
-            self.log_message(self.lang.get('config_path_missing'), "warning")
-            return False
-        
-        config = {
-            'language': self.lang.lang,
-            'list_separators': self.list_separators,
-            'field_types': {},
-            'merge_rules': {},
-            'default_values': {}
-        }
-        
-        # 保存字段类型
-        for row in range(self.field_table.rowCount()):
-            field_item = self.field_table.item(row, 0)
-            combo = self.field_table.cellWidget(row, 1)
-            if field_item and field_item.text() and combo:
-                config['field_types'][field_item.text()] = combo.currentData(Qt.ItemDataRole.UserRole)
-        
-        # 保存合并规则
-        for row in range(self.merge_table.rowCount()):
-            target_item = self.merge_table.item(row, 0)
-            sources_item = self.merge_table.item(row, 1)
-            if target_item and target_item.text() and sources_item and sources_item.text():
-                sources = [s.strip() for s in sources_item.text().split(",") if s.strip()]
-                if sources:
-                    config['merge_rules'][target_item.text()] = sources
-        
-        # 保存默认值
-        for row in range(self.defaults_table.rowCount()):
-            field_item = self.defaults_table.item(row, 0)
-            combo = self.defaults_table.cellWidget(row, 1)
-            value_item = self.defaults_table.item(row, 2)
-            if field_item and field_item.text() and combo and value_item and value_item.text():
-                value_type = combo.currentData(Qt.ItemDataRole.UserRole)
-                config['default_values'][field_item.text()] = {
-                    'type': value_type,
-                    'value': self._convert_config_value(value_item.text(), value_type)
-                }
+    @staticmethod
+    def _compile_merge(target: str, sources: List[str]) -> Callable:
+        """编译一条合并规则：来源字段的值合并为列表写入目标字段，并删除来源字段"""
+        sources = tuple(sources)
+        removed = tuple(src for src in sources if src != target)
         
+        def merge(filepath, original, new, changes):
+            if not any(src in new for src in sources):
+                return
+            values = []
+            for src in sources:
+                val = new.get(src)
+                if val is not None:
+                    if isinstance(val, list):
+                        values.extend(val)
+                    else:
+                        values.append(val)
+            if values:
+                new[target] = values
+                changes.append({
+                    'key': target, 'action': '合并',
+                    'old_value': original.get(target), 'new_value': values
+                })
+            for src in removed:
+                if src in new:
+                    del new[src]
+                    changes.append({
+                        'key': src, 'action': '删除',
+                        'old_value': original.get(src), 'new_value': None
+                    })
+        return merge
+    
+    def _compile_conversion(self, key: str, target_type: str, converter: Callable[[Any], Any]) -> Callable:
+        """编译一条类型转换规则"""
+        analyzer = self.analyzer
+        matcher = self.matcher
+        ignore_null_conflicts = self.ignore_null_conflicts
+        
+        def convert(filepath, original, new, changes):
+            old_val = new.get(key)
+            if old_val is None:
+                return
+            current_type = analyzer.detect_type(old_val, matcher)
+            if current_type == target_type or (ignore_null_conflicts and current_type == 'null'):
+                return
+            try:
+                new_val = converter(old_val)
+            except (ValueError, TypeError) as e:
+                analyzer.log(f"文件 {Path(filepath).name} 字段 {key} 类型转换失败: {str(e)}", "warning")
+                return
+            if new_val is None:
+                # 日期/时间转换无法解析时返回 None，保留原值而不是写成 null
+                analyzer.log(f"文件 {Path(filepath).name} 字段 {key} 类型转换失败: 无法将 {old_val!r} 转换为 {target_type}",
+                             "warning")
+                return
+            new[key] = new_val
+            changes.append({
+                'key': key, 'action': '类型转换',
+                'old_value': old_val, 'new_value': new_val
+            })
+        return convert
+    
+    @staticmethod
+    def _compile_defaults(default_values: Dict[str, Tuple[str, Any]]) -> Callable:
+        """编译默认值规则：缺失或为空的字段填充默认值"""
+        defaults = tuple((key, default_val) for key, (val_type, default_val) in default_values.items())
+        
+        def fill_defaults(filepath, original, new, changes):
+            for key, default_val in defaults:
+                if new.get(key) is None:
+                    new[key] = default_val
+                    changes.append({
+                        'key': key, 'action': '填充默认值',
+                        'old_value': None, 'new_value': default_val
+                    })
+        return fill_defaults
+    
+    def apply(self, filepath: str, frontmatter: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """对已解析的 frontmatter 执行全部步骤，返回新 frontmatter 与变更列表"""
+        new_frontmatter = frontmatter.copy()
+        changes = []
+        for step in self.steps:
+            step(filepath, frontmatter, new_frontmatter, changes)
+        return new_frontmatter, changes
+
+_WORKER_JOURNAL = None  # 工作进程的写入日志，由 _init_worker 创建，该进程处理的所有分片共用
+
+def _init_worker(journal_dir: Optional[str]):
+    """进程池初始化函数：覆盖模式下指定了日志目录时，每个工作进程创建一个写入日志
+
+    日志每条记录都已刷出，进程退出时无需显式关闭。
+    """
+    global _WORKER_JOURNAL
+    _WORKER_JOURNAL = WriteJournal(journal_dir) if journal_dir else None
+
+def _run_shard(mode: str, files: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """进程池工作函数：在子进程中分析或处理一组文件，返回可在主进程合并的结果"""
+    analyzer = FrontmatterAnalyzer()
+    logs = []
+    analyzer.log_callback = lambda message, level: logs.append((message, level))
+    analyzer.input_dir = options['input_dir']
+    analyzer.io_latency = options.get('io_latency', 0.0)
+    analyzer.reader = options.get('reader', 'stream')
+    lang = LanguageManager(options['lang'])
+    list_separators = options['list_separators']
+    records, changes_list = [], []
+    if mode == 'process':
+        analyzer.plan = TransformPlan(
+            analyzer, options['merge_map'], options['field_types'], options['default_values'],
+            options['ignore_null_conflicts'], list_separators
+        )
+        analyzer.journal = _WORKER_JOURNAL
+    
+    for filepath in files:
         try:
-            with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, sort_keys=False)
-            self.log_message(self.lang.get('config_saved').format(config_path), "info")
-            return True
+            frontmatter, body_offset = analyzer._read_header(filepath)
         except Exception as e:
-            self.log_message(self.lang.get('config_save_failed').format(str(e)), "error")
-            return False
+            analyzer.log(f"处理文件 {Path(filepath).name} 失败: {str(e)}", "error")
+            continue
+        if not frontmatter:
+            records.append((filepath, None))
+            if mode == 'process':
+                changes_list.append((filepath, [], None, False))
+            continue
+        
+        records.append((filepath, analyzer._detect_types(frontmatter, list_separators)))
+        if mode == 'process':
+            changes = analyzer.process_file(
+                filepath, options['output_dir'], options['merge_map'], options['field_types'],
+                options['default_values'], options['ignore_null_conflicts'], options['overwrite'],
+                None, lang, list_separators, options['input_dir'], parsed=(frontmatter, body_offset)
+            )
+            changes_list.append((filepath, changes, analyzer.last_write, analyzer.last_failed))
     
-    def _convert_config_value(self, value: str, value_type: str) -> Any:
-        """将配置中的字符串值转换为对应类型"""
-        try:
-            if value_type == 'int':
-                return int(value)
-            elif value_type == 'float':
-                return float(value)
-            elif value_type == 'bool':
-                return value.lower() in ('true', '1', 'yes', 'on')
-            elif value_type == 'date':
-                return datetime.strptime(value, '%Y-%m-%d').date()
-            elif value_type == 'list':
-                return [v.strip() for v in value.split(",") if v.strip()]
-            return value
-        except (ValueError, TypeError) as e:
-            self.log_message(f"配置值转换失败 ({value_type}): {value} -> {str(e)}", "warning")
-            return value
+    metrics = analyzer.metrics.as_dict()
+    metrics['counters'].pop('errors', None)  # 日志在主进程中重放时再计数
+    return {'records': records, 'changes': changes_list, 'logs': logs,
+            'writes_skipped': analyzer.writes_skipped, 'metrics': metrics,
+            'parse_failures': list(analyzer.parse_failures),
+            'memo': {'type': analyzer.type_memo.stats(), 'convert': analyzer.convert_memo.stats()}}
+
+# ====================
+# 主界面类
+# ====================
+
+_GUI = None
+
+def _load_gui():
+    """按需导入 PyQt6 并定义界面类，仅在启动 GUI 时调用"""
+    global _GUI
+    if _GUI is not None:
+        return _GUI
     
-    def validate_inputs(self) -> bool:
-        """验证用户输入的有效性"""
-        input_dir = self.input_dir_edit.text()
-        if not input_dir or not os.path.isdir(input_dir):
-            self.log_message(self.lang.get('invalid_input_dir'), "error")
-            return False
-        
-        if not self.overwrite_check.isChecked():
-            output_dir = self.output_dir_edit.text()
-            if not output_dir:
-                self.log_message(self.lang.get('invalid_output_dir'), "error")
+    from PyQt6.QtWidgets import (
+        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
+        QLineEdit, QPushButton, QFileDialog, QCheckBox, QTabWidget, QTableWidget,
+        QTableWidgetItem, QTextEdit, QMessageBox, QDialog, QDialogButtonBox, QLabel,
+        QComboBox, QProgressBar, QHeaderView
+    )
+    from PyQt6.QtCore import Qt, QThread, pyqtSignal
+    from PyQt6.QtGui import QTextCursor, QTextCharFormat, QColor, QFont
+    
+    class ChangesDialog(QDialog):
+        """交互式变更确认对话框，显示文件变更详情"""
+        def __init__(self, file_path: str, changes: List[Dict[str, Any]], lang: LanguageManager, parent=None):
+            super().__init__(parent)
+            self.lang = lang
+            self.setWindowTitle(self.lang.get('confirm_changes').format(Path(file_path).name))
+            self.setMinimumSize(600, 400)
+
+            layout = QVBoxLayout()
+
+            self.text_edit = QTextEdit()
+            self.text_edit.setReadOnly(True)
+
+            for change in changes:
+                self._append_change(
+                    f"【{change['key']}】 {change.get('action', '修改')}:",
+                    QColor(0, 0, 255)
+                )
+                old_val = f"{change['old_value']}" if change['old_value'] is not None else "空"
+                new_val = f"{change['new_value']}" if change['new_value'] is not None else "空"
+                self._append_change(f"  原值: {old_val}", QColor(128, 0, 0))
+                self._append_change(f"  新值: {new_val}", QColor(0, 100, 0))
+                self.text_edit.append("")
+
+            layout.addWidget(self.text_edit)
+
+            button_box = QDialogButtonBox(
+                QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+            )
+            button_box.accepted.connect(self.accept)
+            button_box.rejected.connect(self.reject)
+            layout.addWidget(button_box)
+
+            self.setLayout(layout)
+
+        def _append_change(self, text: str, color: QColor):
+            """添加带颜色格式的变更文本"""
+            cursor = self.text_edit.textCursor()
+            format_ = QTextCharFormat()
+            format_.setForeground(color)
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text + "\n", format_)
+
+    class ProcessingThread(QThread):
+        """文件处理线程，避免GUI冻结"""
+        progress_updated = pyqtSignal(int, str)  # 进度值, 当前文件
+        progress_range = pyqtSignal(int)         # 已发现的文件总数
+        message_logged = pyqtSignal(str, str)    # 消息内容, 类型(info/warn/error)
+        processing_finished = pyqtSignal(str)    # 报告路径
+
+        def __init__(self, processor, config: Dict[str, Any], lang: LanguageManager):
+            super().__init__()
+            self.processor = processor
+            self.config = config
+            self.lang = lang
+
+        def run(self):
+            """线程主逻辑：批量处理文件并生成报告"""
+            try:
+                report_path = self.processor.process_directory(
+                    input_dir=self.config['input_dir'],
+                    output_dir=self.config['output_dir'],
+                    merge_map=self.config['merge_map'],
+                    field_types=self.config['field_types'],
+                    default_values=self.config['default_values'],
+                    ignore_null_conflicts=self.config['ignore_null_conflicts'],
+                    overwrite=self.config['overwrite'],
+                    thread=self,
+                    lang=self.lang,
+                    list_separators=self.config.get('list_separators', [',', ';', '|']),
+                    single_pass=self.config.get('single_pass', True),
+                    workers=self.config.get('workers', 1),
+                    report_format=self.config.get('report_format', 'xlsx'),
+                    engine=self.config.get('engine', 'serial'),
+                    io_threads=self.config.get('io_threads', IO_THREADS),
+                    queue_size=self.config.get('queue_size', PIPELINE_QUEUE_SIZE),
+                    concurrency=self.config.get('concurrency', ASYNC_CONCURRENCY)
+                )
+                self.processing_finished.emit(report_path)
+            except Exception as e:
+                self.message_logged.emit(f"处理过程中发生致命错误: {str(e)}", "error")
+
+    class MainWindow(QMainWindow):
+        def __init__(self, lang: LanguageManager = None):
+            super().__init__()
+            self.lang = lang if lang else LanguageManager('zh')  # 默认中文
+            self.setWindowTitle(self.lang.get('window_title'))
+            self.setMinimumSize(1000, 800)
+
+            self.analyzer = FrontmatterAnalyzer()
+            self.analyzer.log_callback = self.log_message
+            self.current_report = None
+            self.processing_thread = None
+            self.list_separators = [',', ';', '|']  # 默认列表分隔符
+            self.workers = 1  # 并行工作进程数，0 表示使用全部 CPU 核心
+            self.cache_file = None  # 增量分析缓存文件
+            self.report_format = 'xlsx'  # 报告格式
+            self.engine = 'serial'  # 单进程处理的执行方式
+            self.io_threads = IO_THREADS  # 流水线读取/写入线程数
+            self.queue_size = PIPELINE_QUEUE_SIZE  # 流水线在途文件数上限
+            self.concurrency = ASYNC_CONCURRENCY  # async 方式在途读写数上限
+
+            self.init_ui()
+
+        def init_ui(self):
+            """初始化图形用户界面"""
+            central_widget = QWidget()
+            self.setCentralWidget(central_widget)
+            main_layout = QVBoxLayout(central_widget)
+
+            # 文件路径配置区域
+            path_group = QWidget()
+            path_layout = QFormLayout(path_group)
+
+            self.input_dir_edit = QLineEdit()
+            input_browse_btn = QPushButton(self.lang.get('browse'))
+            input_browse_btn.clicked.connect(self.browse_input_dir)
+            input_layout = QHBoxLayout()
+            input_layout.addWidget(self.input_dir_edit)
+            input_layout.addWidget(input_browse_btn)
+            path_layout.addRow(self.lang.get('input_dir'), input_layout)
+
+            self.output_dir_edit = QLineEdit()
+            output_browse_btn = QPushButton(self.lang.get('browse'))
+            output_browse_btn.clicked.connect(self.browse_output_dir)
+            output_layout = QHBoxLayout()
+            output_layout.addWidget(self.output_dir_edit)
+            output_layout.addWidget(output_browse_btn)
+            path_layout.addRow(self.lang.get('output_dir'), output_layout)
+
+            # 语言与选项组
+            options_group = QWidget()
+            options_layout = QHBoxLayout(options_group)
+
+            self.language_combo = QComboBox()
+            self.language_combo.addItems(['English', '中文', 'Français', 'Español', 'العربية', 'Русский'])
+            self.language_combo.setCurrentText('中文')
+            self.language_combo.currentIndexChanged.connect(self.change_language)
+            options_layout.addWidget(QLabel(self.lang.get('language')))
+            options_layout.addWidget(self.language_combo)
+
+            self.overwrite_check = QCheckBox(self.lang.get('overwrite'))
+            self.overwrite_check.stateChanged.connect(self.toggle_output_dir)
+            options_layout.addWidget(self.overwrite_check)
+
+            self.ignore_null_check = QCheckBox(self.lang.get('ignore_null'))
+            options_layout.addWidget(self.ignore_null_check)
+
+            # 配置选项区域
+            config_group = QWidget()
+            config_layout = QFormLayout(config_group)
+
+            self.config_edit = QLineEdit("frontmatter_config.yaml")
+            config_browse_btn = QPushButton(self.lang.get('browse'))
+            config_browse_btn.clicked.connect(self.browse_config)
+            config_btn_layout = QHBoxLayout()
+            config_btn_layout.addWidget(self.config_edit)
+            config_btn_layout.addWidget(config_browse_btn)
+            config_layout.addRow(self.lang.get('config_file'), config_btn_layout)
+
+            # 主选项卡
+            self.tab_widget = QTabWidget()
+
+            self.field_type_tab = QWidget()
+            self.init_field_type_tab()
+            self.tab_widget.addTab(self.field_type_tab, self.lang.get('field_types'))
+
+            self.merge_tab = QWidget()
+            self.init_merge_tab()
+            self.tab_widget.addTab(self.merge_tab, self.lang.get('merge_rules'))
+
+            self.defaults_tab = QWidget()
+            self.init_defaults_tab()
+            self.tab_widget.addTab(self.defaults_tab, self.lang.get('default_values'))
+
+            # 检测结果区域
+            self.results_table = QTableWidget(0, 3)
+            self.results_table.setHorizontalHeaderLabels([
+                self.lang.get('field_name'), self.lang.get('type'), "Files"
+            ])
+            self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+            # 日志区域
+            self.log_area = QTextEdit()
+            self.log_area.setReadOnly(True)
+
+            # 进度条
+            self.progress_bar = QProgressBar()
+            self.progress_bar.setVisible(False)
+
+            # 按钮区域
+            button_group = QWidget()
+            button_layout = QHBoxLayout(button_group)
+
+            analyze_btn = QPushButton(self.lang.get('analyze'))
+            analyze_btn.clicked.connect(self.run_analysis)
+            button_layout.addWidget(analyze_btn)
+
+            process_btn = QPushButton(self.lang.get('process'))
+            process_btn.clicked.connect(self.start_processing)
+            button_layout.addWidget(process_btn)
+
+            report_btn = QPushButton(self.lang.get('view_report'))
+            report_btn.clicked.connect(self.open_report)
+            button_layout.addWidget(report_btn)
+
+            main_layout.addWidget(path_group)
+            main_layout.addWidget(options_group)
+            main_layout.addWidget(config_group)
+            main_layout.addWidget(self.tab_widget)
+            main_layout.addWidget(self.results_table)
+            main_layout.addWidget(self.progress_bar)
+            main_layout.addWidget(self.log_area)
+            main_layout.addWidget(button_group)
+
+        def init_field_type_tab(self):
+            """初始化字段类型配置选项卡"""
+            layout = QVBoxLayout(self.field_type_tab)
+
+            self.field_table = QTableWidget(0, 2)
+            self.field_table.setHorizontalHeaderLabels([self.lang.get('field_name'), self.lang.get('target_type')])
+            self.field_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+            add_row_btn = QPushButton(self.lang.get('add_field'))
+            add_row_btn.clicked.connect(self.add_field_row)
+
+            layout.addWidget(self.field_table)
+            layout.addWidget(add_row_btn)
+
+        def init_merge_tab(self):
+            """初始化合并规则选项卡"""
+            layout = QVBoxLayout(self.merge_tab)
+
+            self.merge_table = QTableWidget(0, 2)
+            self.merge_table.setHorizontalHeaderLabels([self.lang.get('target_field'), self.lang.get('source_fields')])
+            self.merge_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+            add_row_btn = QPushButton(self.lang.get('add_rule'))
+            add_row_btn.clicked.connect(self.add_merge_row)
+
+            layout.addWidget(self.merge_table)
+            layout.addWidget(add_row_btn)
+
+        def init_defaults_tab(self):
+            """初始化默认值选项卡"""
+            layout = QVBoxLayout(self.defaults_tab)
+
+            self.defaults_table = QTableWidget(0, 3)
+            self.defaults_table.setHorizontalHeaderLabels([
+                self.lang.get('field_name'), self.lang.get('type'), self.lang.get('default_value')
+            ])
+            self.defaults_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+            add_row_btn = QPushButton(self.lang.get('add_default'))
+            add_row_btn.clicked.connect(self.add_default_row)
+
+            layout.addWidget(self.defaults_table)
+            layout.addWidget(add_row_btn)
+
+        def add_field_row(self):
+            """添加字段类型配置行"""
+            row = self.field_table.rowCount()
+            self.field_table.insertRow(row)
+
+            type_combo = QComboBox()
+            type_combo.addItems([
+                self.lang.get_type_display('str'), self.lang.get_type_display('int'),
+                self.lang.get_type_display('float'), self.lang.get_type_display('bool'),
+                self.lang.get_type_display('date'), self.lang.get_type_display('datetime'),
+                self.lang.get_type_display('list')
+            ])
+            type_combo.setItemData(0, 'str', Qt.ItemDataRole.UserRole)
+            type_combo.setItemData(1, 'int', Qt.ItemDataRole.UserRole)
+            type_combo.setItemData(2, 'float', Qt.ItemDataRole.UserRole)
+            type_combo.setItemData(3, 'bool', Qt.ItemDataRole.UserRole)
+            type_combo.setItemData(4, 'date', Qt.ItemDataRole.UserRole)
+            type_combo.setItemData(5, 'datetime', Qt.ItemDataRole.UserRole)
+            type_combo.setItemData(6, 'list', Qt.ItemDataRole.UserRole)
+            self.field_table.setCellWidget(row, 1, type_combo)
+
+        def add_merge_row(self):
+            """添加合并规则行"""
+            row = self.merge_table.rowCount()
+            self.merge_table.insertRow(row)
+
+        def add_default_row(self):
+            """添加默认值规则行"""
+            row = self.defaults_table.rowCount()
+            self.defaults_table.insertRow(row)
+
+            type_combo = QComboBox()
+            type_combo = ['add_items']
+            for type_name in ['str', 'int', 'float', 'bool', 'date', 'datetime', 'list']:
+                type_combo.addItem(self.lang.get_type_display(type_name))
+                type_combo.setItemData(type_combo.count() - 1, type_name, Qt.ItemDataRole.UserRole)
+            self.defaults_table.setCellWidget(row, 1, type_combo)
+
+        def browse_input_dir(self):
+            """浏览并选择输入目录"""
+            dir_path = QFileDialog.getExistingDirectory(self, self.lang.get('input_dir'))
+            if dir_path:
+                self.input_dir_edit.setText(dir_path)
+                if not self.output_dir_edit.text() and not self.overwrite_check.isChecked():
+                    self.output_dir_edit.setText(str(Path(dir_path) / 'output'))
+
+        def browse_output_dir(self):
+            """浏览并选择输出目录"""
+            dir_path = QFileDialog.getExistingDirectory(self, self.lang.get('output_dir'))
+            if dir_path:
+                self.output_dir_edit.setText(dir_path)
+
+        def browse_config(self):
+            """浏览并选择配置文件"""
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, self.lang.get('config_file'), filter="YAML Files (*.yaml *.yml)")
+
+            if file_path:
+                self.config_edit.setText(file_path)
+                self.load_config()
+
+        def toggle_output_dir(self):
+            """切换覆盖模式时控制输出目录输入框启用状态"""
+            self.output_dir_edit.setEnabled(not self.overwrite_check.isChecked())
+
+        def change_language(self, index):
+            """动态切换语言"""
+            lang_map = {
+                'English': 'en'
+                , '中文': 'zh'
+                , 'Français': 'fr'
+                , 'es':'es'
+                , 'العربية': 'ar'
+                , 'Русский': 'ru'
+            }
+            new_lang = lang_map[self.language_combo.itemText(index)]
+            self.lang = LanguageManager(new_lang)
+            self.update_ui_texts()
+
+        def update_ui_texts(self):
+            """更新界面文本以反映当前语言"""
+            self.setWindowTitle(self.lang.get('window_title'))
+
+            # 更新路径标签
+            path_group = self.centralWidget().layout().itemAt(0).widget()
+            path_layout = path_group.layout()
+            path_layout.itemAt(0).labelItem().setText(self.lang.get('input_dir'))
+            path_layout.itemAt(1).layout().itemAt(1).widget().setText(self.lang.get('browse'))
+            path_layout.itemAt(1).labelItem().setText(self.lang.get('output_dir'))
+            path_layout.itemAt(1).layout().itemAt(1).widget().setText(self.lang.get('browse'))
+
+            # 更新选项组
+            options_group = self.centralWidget().layout().itemAt(1).widget()
+            options_layout = options_group.layout()
+            options_layout.itemAt(0).widget().setText(self.lang.get('language'))
+            self.overwrite_check.setText(self.lang.get('overwrite'))
+            self.ignore_null_check.setText(self.lang.get('ignore_null'))
+
+            # 更新配置文件区域
+            config_group = self.centralWidget().layout().itemAt(2).widget()
+            config_layout = config_group.layout()
+            config_layout.itemAt(0).labelItem().setText(self.lang.get('config_file'))
+            config_layout.itemAt(layout(0)).itemAt(1).widget().setText(self.lang.get('browse'))
+
+            # 更新选项卡
+            self.tab_widget.setTabText(0, self.lang.get('field_types'))
+            self.tab_widget.setTabText(1, self.lang.get('merge_rules'))
+            self.tab_widget.setTabText(2, self.lang.get('default_values'))
+
+            self.field_table.setHorizontalHeaderLabels([self.lang.get("field_name"), self.lang.get("target_type")])
+            self.merge_table.setHorizontalHeaderLabels([self.lang.get("target_field"), self.lang.get("source_fields")])
+            self.defaults_table.setHorizontalHeaderLabels([
+                self.lang.get('field_name'), self.lang.get('type'), self.lang.get('default_value')
+            ])
+            self.results_table.setHorizontalHeaderLabels([
+                self.lang.get('field_name'), self.lang.get('type'), 'Files'
+            ])
+
+            # 更新按钮
+            button_group = self.centralWidget().layout().itemAt(6).widget()
+            button_layout = button_group.layout()
+            button_layout.itemAt(0).widget().setText(self.lang.get('analyze'))
+            button_layout.itemAt(1).widget().setText(self.lang.get('process_button'))
+            button_layout.itemAt(2).widget().setText(self.lang.get('view_report'))
+
+        def load_config(self):
+            """从 YAML 文件加载配置"""
+            config_path = self.config_edit.text()
+            if not config_path or not os.path.exists(config_path):
+                self.log_message(self.lang.get('config_not_found').format(config_path), "warning")
+                return
+
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f) or {}
+
+                # 加载语言设置
+                if 'language' in config:
+                    lang_map = {
+                        'en': 'English', 'zh': '中文', 'fr': 'Français',
+                        'es': 'Español', 'ar': 'العربية', 'ru': 'Русский'
+                    }
+                    if config['language'] in lang_map:
+                        self.language_combo.setCurrentText(lang_map[config['language']])
+                        self.change_language(self.language_combo.currentIndex())
+
+                # 加载列表分隔符
+                if 'list_separators' in config:
+                    self.list_separators = config['list_separators']
+
+                # 加载并行工作进程数
+                if 'workers' in config:
+                    self.workers = int(config['workers'])
+                
+                # 加载增量分析缓存文件
+                self.cache_file = config.get('cache_file')
+                
+                # 加载报告格式
+                self.report_format = config.get('report_format', 'xlsx')
+                
+                # 加载执行方式
+                self.engine = config.get('engine', 'serial')
+                self.io_threads = int(config.get('io_threads', IO_THREADS))
+                self.queue_size = int(config.get('queue_size', PIPELINE_QUEUE_SIZE))
+                self.concurrency = int(config.get('concurrency', ASYNC_CONCURRENCY))
+                
+                # 加载 frontmatter 读取方式
+                self.analyzer.reader = config.get('reader', 'stream')
+                
+                # 加载文件过滤规则
+                self.analyzer.include_patterns = list(config.get('include') or DEFAULT_INCLUDE)
+                self.analyzer.exclude_patterns = list(config.get('exclude') or [])
+
+                # 加载字段类型
+                self.field_table.setRowCount(0)
+                for field, field_type in config.get('field_types', {}).items():
+                    row = self.field_table.rowCount()
+                    self.field_table.insertRow(row)
+                    self.field_table.setRowItem(row, 0, QTableWidgetItem(field))
+                    combo = QComboBox()
+                    combo.addItems([
+                        self.lang.get_type_display('str'), self.lang.get_type_display('int'),
+                        self.lang.get_type_display('float'), self.lang.get_type_display('bool'),
+                        self.lang.get_type_display('date'), self.lang.get_type_display('datetime'),
+                        self.lang.get_type_display('list')
+                    ])
+                    combo.setItemData(0, 'str', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(1, 'int', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(2, 'float', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(3, 'bool', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(4, 'date', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(5, 'datetime', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(6, 'list', Qt.ItemDataRole.UserRole)
+                    if field_type in FrontmatterAnalyzer.SUPPORTED_TYPES:
+                        combo.setCurrentText(self.lang.get_type_display(field_type))
+                    self.field_table.setCellWidget(row, 1, combo)
+
+                # 加载合并规则
+                self.merge_table.setRowCount(0)
+                for target, sources in config.get('merge_rules', {}).items():
+                    row = self.merge_table.rowCount()
+                    self.merge_table.insertRow(row)
+                    self.merge_table.setItem(row, 0, QTableWidgetItem(target))
+                    self.merge_table.setItem(row, 1, QTableWidgetItem(",".join(sources)))
+
+                # 加载默认值
+                self.defaults_table.setRowCount(0)
+                for field, value_info in config.get('default_values', {}).items():
+                    row = self.defaults_table.rowCount()
+                    self.defaults_table.insertRow(row)
+                    self.defaults_table.setItem(row, 0, QTableWidgetItem(field))
+
+                    combo = QComboBox()
+                    combo.addItems([
+                        self.lang.get_type_display('str'), self.lang.get_type_display('int'),
+                        self.lang.get_type_display('float'), self.lang.get_type_display('bool'),
+                        self.lang.get_type_display('date'), self.lang.get_type_display('datetime'),
+                        self.lang.get_type_display('list')
+                    ])
+                    combo.setItemData(0, 'str', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(1, 'int', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(2, 'float', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(3, 'bool', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(4, 'date', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(5, 'datetime', Qt.ItemDataRole.UserRole)
+                    combo.setItemData(6, 'list', Qt.ItemDataRole.UserRole)
+
+                    value_type = value_info.get('type', 'str')
+                    combo.setCurrentText(self.lang.get_type_display(value_type))
+                    self.defaults_table.setCellWidget(row, 1, combo)
+                    self.defaults_table.setItem(row, 2, QTableWidgetItem(str(value_info.get('value', ''))))
+
+                self.log_message(self.lang.get('config_saved').format(config_path), "info")
+            except Exception as e:
+                self.log_message(self.lang.get('config_load_failed').format(str(e)), "error")
+
+        def save_config(self):
+            """保存当前配置到 YAML 文件，包括语言和分隔符设置"""
+            config_path = self.config_edit.text()
+            if not config_path:
+                self.log_message(self.lang.get('config_path_missing'), "warning")
                 return False
+
+            config = {
+                'language': self.lang.lang,
+                'list_separators': self.list_separators,
+                'workers': self.workers,
+                'cache_file': self.cache_file,
+                'report_format': self.report_format,
+                'engine': self.engine,
+                'io_threads': self.io_threads,
+                'queue_size': self.queue_size,
+                'concurrency': self.concurrency,
+                'reader': self.analyzer.reader,
+                'include': self.analyzer.include_patterns,
+                'exclude': self.analyzer.exclude_patterns,
+                'field_types': {},
+                'merge_rules': {},
+                'default_values': {}
+            }
+
+            # 保存字段类型
+            for row in range(self.field_table.rowCount()):
+                field_item = self.field_table.item(row, 0)
+                combo = self.field_table.cellWidget(row, 1)
+                if field_item and field_item.text() and combo:
+                    config['field_types'][field_item.text()] = combo.currentData(Qt.ItemDataRole.UserRole)
+
+            # 保存合并规则
+            for row in range(self.merge_table.rowCount()):
+                target_item = self.merge_table.item(row, 0)
+                sources_item = self.merge_table.item(row, 1)
+                if target_item and target_item.text() and sources_item and sources_item.text():
+                    sources = [s.strip() for s in sources_item.text().split(",") if s.strip()]
+                    if sources:
+                        config['merge_rules'][target_item.text()] = sources
+
+            # 保存默认值
+            for row in range(self.defaults_table.rowCount()):
+                field_item = self.defaults_table.item(row, 0)
+                combo = self.defaults_table.cellWidget(row, 1)
+                value_item = self.defaults_table.item(row, 2)
+                if field_item and field_item.text() and combo and value_item and value_item.text():
+                    value_type = combo.currentData(Qt.ItemDataRole.UserRole)
+                    config['default_values'][field_item.text()] = {
+                        'type': value_type,
+                        'value': self._convert_config_value(value_item.text(), value_type)
+                    }
+
             try:
-                Path(output_dir).mkdir(parents=True, exist_ok=True)
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    yaml.dump(config, f, allow_unicode=True, sort_keys=False)
+                self.log_message(self.lang.get('config_saved').format(config_path), "info")
+                return True
             except Exception as e:
-                self.log_message(self.lang.get('cannot_create_output').format(str(e)), "error")
+                self.log_message(self.lang.get('config_save_failed').format(str(e)), "error")
                 return False
-        
-        return True
-    
-    def run_analysis(self):
-        """执行 frontmatter 分析并在 GUI 中显示结果"""
-        if not self.validate_inputs():
-            return
-        
-        self.log_area.clear()
-        self.results_table.setRowCount(0)
-        input_dir = self.input_dir_edit.text()
-        self.log_message(f"{self.lang.get('analyze')} {input_dir}", "info")
-        
-        self.analyzer.analyze_files(input_dir, self.lang, self.list_separators)
-        
-        # 显示检测结果
-        conflict_count = 0
-        for field, type_info in self.analyzer.type_conflicts.items():
-            non_null_types = [t for t, files in type_info.items() if t != 'null' and files]
-            row = self.results_table.rowCount()
-            self.results_table.insertRow(row)
-            self.results_table.setItem(row, 0, QTableWidgetItem(field))
-            types = [self.lang.get_type_display(t) for t, files in type_info.items() if files]
-            self.results_table.setItem(row, 1, QTableWidgetItem(", ".join(sorted(types))))
-            self.results_table.setItem(row, 2, QTableWidgetItem(str(sum(len(f) for f in type_info.values()))))
-            if len(non_null_types) > 1:
-                self.log_message(self.lang.get('type_conflict').format(field, ', '.join(non_null_types)), "warning")
-                conflict_count += 1
-        
-        if conflict_count == 0:
-            self.log_message(self.lang.get('no_conflicts'), "info")
-        else:
-            self.log_message(self.lang.get('conflicts_found').format(conflict_count), "warning")
-        
-        if self.analyzer.valid_files:
-            output_dir = input_dir if self.overwrite_check.isChecked() else self.output_dir_edit.text()
-            self.current_report = self.analyzer.generate_report(output_dir)
-            self.log_message(self.lang.get('analysis_complete').format(self.current_report), "info")
-    
-    def start_processing(self):
-        """开始批量处理文件"""
-        if not self.validate_inputs():
-            return
-        
-        if not self.save_config():
-            return
-        
-        config = {
-            'input_dir': self.input_dir_edit.text(),
-            'output_dir': self.output_dir_edit.text(),
-            'overwrite': self.overwrite_check.isChecked(),
-            'ignore_null_conflicts': self.ignore_null_check.isChecked(),
-            'list_separators': self.list_separators,
-            'field_types': {},
-            'merge_map': {},
-            'default_values': {}
-        }
-        
-        # 收集字段类型
-        for row in range(self.field_table.rowCount()):
-            field_item = self.field_table.item(row, 0)
-            combo = self.field_table.cellWidget(row, 1)
-            if field_item and field_item.text() and combo:
-                config['field_types'][field_item.text()] = combo.currentData(Qt.ItemDataRole.UserRole)
-        
-        # 收集合并规则
-        for row in range(self.merge_table.rowCount()):
-            target_item = self.merge_table.item(row, 0)
-            sources_item = self.merge_table.item(row, 1)
-            if target_item and target_item.text() and sources_item and sources_item.text():
-                sources = [s.strip() for s in sources_item.text().split(',') if s.strip()]
-                if sources:
-                    config['merge_map'][target_item.text()] = sources
-        
-        # 收集默认值配置
-        for row in range(self.defaults_table.rowCount()):
-            field_item = self.defaults_table.item(row, 0)
-            combo = self.defaults_table.cellWidget(row, 1)
-            value_item = self.defaults_table.item(row, 2)
-            if field_item and field_item.text() and combo and value_item and value_item.text():
-                value_type = combo.currentData(Qt.ItemDataRole.UserRole)
-                config['default_values'][field_item.text()] = (
-                    value_type,
-                    self._convert_config_value(value_item.text(), value_type)
+
+        def _convert_config_value(self, value: str, value_type: str) -> Any:
+            """将配置中的字符串值转换为对应类型"""
+            try:
+                if value_type == 'int':
+                    return int(value)
+                elif value_type == 'float':
+                    return float(value)
+                elif value_type == 'bool':
+                    return value.lower() in ('true', '1', 'yes', 'on')
+                elif value_type == 'date':
+                    return datetime.strptime(value, '%Y-%m-%d').date()
+                elif value_type == 'list':
+                    return [v.strip() for v in value.split(",") if v.strip()]
+                return value
+            except (ValueError, TypeError) as e:
+                self.log_message(f"配置值转换失败 ({value_type}): {value} -> {str(e)}", "warning")
+                return value
+
+        def validate_inputs(self) -> bool:
+            """验证用户输入的有效性"""
+            input_dir = self.input_dir_edit.text()
+            if not input_dir or not os.path.isdir(input_dir):
+                self.log_message(self.lang.get('invalid_input_dir'), "error")
+                return False
+
+            if not self.overwrite_check.isChecked():
+                output_dir = self.output_dir_edit.text()
+                if not output_dir:
+                    self.log_message(self.lang.get('invalid_output_dir'), "error")
+                    return False
+                try:
+                    Path(output_dir).mkdir(parents=True, exist_ok=True)
+                except Exception as e:
+                    self.log_message(self.lang.get('cannot_create_output').format(str(e)), "error")
+                    return False
+
+            return True
+
+        def run_analysis(self):
+            """执行 frontmatter 分析并在 GUI 中显示结果"""
+            if not self.validate_inputs():
+                return
+
+            self.log_area.clear()
+            self.results_table.setRowCount(0)
+            input_dir = self.input_dir_edit.text()
+            self.log_message(f"{self.lang.get('analyze')} {input_dir}", "info")
+
+            self.analyzer.analyze_files(input_dir, self.lang, self.list_separators, self.workers,
+                                        cache_path=self.cache_file, engine=self.engine,
+                                        concurrency=self.concurrency, io_threads=self.io_threads,
+                                        queue_size=self.queue_size)
+
+            # 显示检测结果
+            conflict_count = 0
+            for field, type_info in self.analyzer.type_conflicts.items():
+                non_null_types = [t for t, files in type_info.items() if t != 'null' and files]
+                row = self.results_table.rowCount()
+                self.results_table.insertRow(row)
+                self.results_table.setItem(row, 0, QTableWidgetItem(field))
+                types = [self.lang.get_type_display(t) for t, files in type_info.items() if files]
+                self.results_table.setItem(row, 1, QTableWidgetItem(", ".join(sorted(types))))
+                self.results_table.setItem(row, 2, QTableWidgetItem(str(sum(len(f) for f in type_info.values()))))
+                if len(non_null_types) > 1:
+                    self.log_message(self.lang.get('type_conflict').format(field, ', '.join(non_null_types)), "warning")
+                    conflict_count += 1
+
+            if conflict_count == 0:
+                self.log_message(self.lang.get('no_conflicts'), "info")
+            else:
+                self.log_message(self.lang.get('conflicts_found').format(conflict_count), "warning")
+
+            if self.analyzer.valid_files:
+                output_dir = input_dir if self.overwrite_check.isChecked() else self.output_dir_edit.text()
+                self.current_report = self.analyzer.generate_report(output_dir, self.report_format)
+                self.log_message(self.lang.get('analysis_complete').format(self.current_report), "info")
+
+        def start_processing(self):
+            """开始批量处理文件"""
+            if not self.validate_inputs():
+                return
+
+            if not self.save_config():
+                return
+
+            config = {
+                'input_dir': self.input_dir_edit.text(),
+                'output_dir': self.output_dir_edit.text(),
+                'overwrite': self.overwrite_check.isChecked(),
+                'ignore_null_conflicts': self.ignore_null_check.isChecked(),
+                'list_separators': self.list_separators,
+                'workers': self.workers,
+                'report_format': self.report_format,
+                'engine': self.engine,
+                'io_threads': self.io_threads,
+                'queue_size': self.queue_size,
+                'concurrency': self.concurrency,
+                'field_types': {},
+                'merge_map': {},
+                'default_values': {}
+            }
+
+            # 收集字段类型
+            for row in range(self.field_table.rowCount()):
+                field_item = self.field_table.item(row, 0)
+                combo = self.field_table.cellWidget(row, 1)
+                if field_item and field_item.text() and combo:
+                    config['field_types'][field_item.text()] = combo.currentData(Qt.ItemDataRole.UserRole)
+
+            # 收集合并规则
+            for row in range(self.merge_table.rowCount()):
+                target_item = self.merge_table.item(row, 0)
+                sources_item = self.merge_table.item(row, 1)
+                if target_item and target_item.text() and sources_item and sources_item.text():
+                    sources = [s.strip() for s in sources_item.text().split(',') if s.strip()]
+                    if sources:
+                        config['merge_map'][target_item.text()] = sources
+
+            # 收集默认值配置
+            for row in range(self.defaults_table.rowCount()):
+                field_item = self.defaults_table.item(row, 0)
+                combo = self.defaults_table.cellWidget(row, 1)
+                value_item = self.defaults_table.item(row, 2)
+                if field_item and field_item.text() and combo and value_item and value_item.text():
+                    value_type = combo.currentData(Qt.ItemDataRole.UserRole)
+                    config['default_values'][field_item.text()] = (
+                        value_type,
+                        self._convert_config_value(value_item.text(), value_type)
+                    )
+
+            # 启动处理线程
+            self.log_area.clear()
+            self.progress_bar.setVisible(True)
+            self.progress_bar.setValue(0)
+
+            # 文件总数由处理线程在遍历目录时给出，此前显示为忙碌状态
+            self.progress_bar.setMaximum(0)
+
+            self.processing_thread = ProcessingThread(self.analyzer, config, self.lang)
+            self.processing_thread.progress_range.connect(self.progress_bar.setMaximum)
+            self.processing_thread.progress_updated.connect(self.update_progress)
+            self.processing_thread.message_logged.connect(self.log_message)
+            self.processing_thread.processing_finished.connect(self.on_processing_finished)
+            self.processing_thread.start()
+
+        def update_progress(self, value: int, file_name: str):
+            """更新进度条和当前处理文件信息"""
+            self.progress_bar.setValue(value)
+            self.log_message(self.lang.get('processing_file').format(file_name), "info")
+
+        def on_processing_finished(self, report_path: str):
+            """处理完成后的回调"""
+            self.progress_bar.setVisible(False)
+            self.current_report = report_path
+            self.log_message(self.lang.get('processing_complete').format(report_path), "info")
+            QMessageBox.information(self, "完成", self.lang.get('processing_complete').format(report_path))
+            self.processing_thread = None
+
+        def open_report(self):
+            """打开生成的 Excel报告"""
+            if not self.current_report or not os.path.exists(self.current_report):
+                QMessageBox.warning(self, "警告", self.lang.get('no_report'))
+                return
+
+            try:
+                import webbrowser
+                webbrowser.open(f"file://{self.current_report}")
+            except Exception as e:
+                QMessageBox.critical(self, "错误", self.lang.get('error_opening_report').format(str(e)))
+
+        def log_message(self, message: str, level: str = "info"):
+            """格式化并显示日志消息"""
+            cursor = self.log_area.textCursor()
+            format_ = QTextCharFormat()
+
+            if level == "error":
+                format_.setForeground(QColor(220, 20, 60))
+            elif level == "warning":
+                format_.setForeground(QColor(255, 165, 0))
+            else:
+                format_.setForeground(QColor(0, 0, 0))
+
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ", format_)
+
+            format_.setFontWeight(QFont.Weight.Bold if level in ("error", "warning") else QFont.Weight.Normal)
+            cursor.insertText(f"[{level.upper()}] ", format_)
+
+            format_.setFontWeight(QFont.Weight.Normal)
+            cursor.insertText(f"{message}\n", format_)
+
+            self.log_area.ensureCursorVisible()
+
+            lines = self.log_area.toPlainText().split("\n")
+            if len(lines) > 1000:
+                self.log_area.setPlainText("\n".join(lines[-1000:]))
+
+        def closeEvent(self, event):
+            """处理窗口关闭事件"""
+            if self.processing_thread and self.processing_thread.isRunning():
+                reply = QMessageBox.question(
+                    self, "确认退出",
+                    "后台确认处理仍在进行中，确定要退出吗？",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
-        
-        # 启动处理线程
-        self.log_area.clear()
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        
-        total_files = sum(1 for _ in Path(config['input_dir']).rglob("*.md")) + \
-            sum(1 for _ in Path(config['input_dir']).rglob("*.markdown"))
-        self.progress_bar.setMaximum(max(total_files, 1))
-        
-        self.processing_thread = ProcessingThread(self.analyzer, config, self.lang)
-        self.processing_thread.progress_updated.connect(self.update_progress)
-        self.processing_thread.message_logged.connect(self.log_message)
-        self.processing_thread.processing_finished.connect(self.on_processing_finished)
-        self.processing_thread.start()
-        
-    def update_progress(self, value: int, file_name: str):
-        """更新进度条和当前处理文件信息"""
-        self.progress_bar.setValue(value)
-        self.log_message(self.lang.get('processing_file').format(file_name), "info")
-        
-    def on_processing_finished(self, report_path: str):
-        """处理完成后的回调"""
-        self.progress_bar.setVisible(False)
-        self.current_report = report_path
-        self.log_message(self.lang.get('processing_complete').format(report_path), "info")
-        QMessageBox.information(self, "完成", self.lang.get('processing_complete').format(report_path))
-        self.processing_thread = None
-    
-    def open_report(self):
-        """打开生成的 Excel报告"""
-        if not self.current_report or not os.path.exists(self.current_report):
-            QMessageBox.warning(self, "警告", self.lang.get('no_report'))
-            return
-        
+                if reply == QMessageBox.StandardButton.No:
+                    event.ignore()
+                    return
+            event.accept()
+    
+    _GUI = SimpleNamespace(
+        QApplication=QApplication, ChangesDialog=ChangesDialog,
+        ProcessingThread=ProcessingThread, MainWindow=MainWindow
+    )
+    return _GUI
+
+def __getattr__(name: str) -> Any:
+    """兼容旧用法：访问界面类时再加载 PyQt6"""
+    if name in ('ChangesDialog', 'ProcessingThread', 'MainWindow'):
+        return getattr(_load_gui(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ====================
+# 命令行模式
+# ====================
+
+EXIT_OK = 0          # 成功
+EXIT_ERROR = 1       # 致命错误或没有有效文件
+EXIT_USAGE = 2       # 参数错误（argparse 约定）
+EXIT_PARTIAL = 3     # 完成，但部分文件处理失败
+EXIT_CONFLICTS = 4   # 分析完成且发现类型冲突（需 --fail-on-conflicts）
+
+CLI_COMMANDS = ('analyze', 'process', 'rollback', 'gui', 'startup-check', 'benchmark')
+ANALYSIS_CACHE_NAME = '.frontmatter_analysis_cache.sqlite'
+CHECKPOINT_NAME = '.frontmatter_checkpoint.jsonl'
+
+STARTUP_BUDGET_MS = 150  # 导入核心模块的耗时上限（毫秒），由 startup-check 校验
+HEAVY_MODULES = ('pandas', 'PyQt6', 'xlsxwriter', 'concurrent.futures')  # 不应在导入时加载的模块
+PROFILE_NAME = 'frontmatter_profile'  # --profile 输出的 .prof 与摘要文件名（位于报告目录）
+BENCH_FIELD_TYPES = ('str', 'int', 'float', 'list', 'date', 'bool')  # 合成字段依次使用的类型
+
+def measure_startup(repeat: int = 3) -> Dict[str, Any]:
+    """在子进程中用 python -X importtime 测量导入本模块的耗时（取多次最小值），
+    并列出导入时被提前加载的重量级模块"""
+    import subprocess
+    module = Path(__file__).stem
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    timings, heavy = [], []
+    for _ in range(max(1, repeat)):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=str(Path(__file__).resolve().parent), capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() == module:
+                timings.append(int(parts[1].strip()) / 1000)
+        heavy = [m for m in result.stdout.strip().split(',') if m]
+    return {'module': module, 'import_ms': round(min(timings), 1) if timings else None, 'heavy_modules': heavy}
+
+def run_startup_check(budget_ms: float, repeat: int) -> int:
+    """校验导入耗时不超过预算且没有提前加载重量级依赖"""
+    import json
+    try:
+        result = measure_startup(repeat)
+    except Exception as e:
+        print(f"[ERROR] 启动时间测量失败: {str(e)}", file=sys.stderr)
+        return EXIT_ERROR
+    result['budget_ms'] = budget_ms
+    result['ok'] = (result['import_ms'] is not None and result['import_ms'] <= budget_ms
+                    and not result['heavy_modules'])
+    print(json.dumps(result, ensure_ascii=False))
+    return EXIT_OK if result['ok'] else EXIT_ERROR
+
+def load_config_file(config_path: str) -> Dict[str, Any]:
+    """读取 YAML 配置文件并转换为处理所需的参数结构"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    return {
+        'language': config.get('language'),
+        'list_separators': config.get('list_separators', [',', ';', '|']),
+        'workers': int(config.get('workers', 1)),
+        'cache_file': config.get('cache_file'),
+        'report_format': config.get('report_format', 'xlsx'),
+        'engine': config.get('engine', 'serial'),
+        'io_threads': int(config.get('io_threads', IO_THREADS)),
+        'queue_size': int(config.get('queue_size', PIPELINE_QUEUE_SIZE)),
+        'concurrency': int(config.get('concurrency', ASYNC_CONCURRENCY)),
+        'reader': config.get('reader', 'stream'),
+        'include': list(config.get('include') or DEFAULT_INCLUDE),
+        'exclude': list(config.get('exclude') or []),
+        'field_types': dict(config.get('field_types') or {}),
+        'merge_map': {target: list(sources) for target, sources in (config.get('merge_rules') or {}).items()},
+        'default_values': {
+            field: (info.get('type', 'str'), info.get('value'))
+            for field, info in (config.get('default_values') or {}).items()
+        },
+    }
+
+def _build_parser() -> 'argparse.ArgumentParser':
+    """构建命令行参数解析器"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Markdown Frontmatter 处理器（无界面批处理与 GUI 启动）"
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('input_dir', help="包含 Markdown 文件的输入目录")
+    common.add_argument('-c', '--config', help="YAML 配置文件")
+    common.add_argument('-l', '--lang', choices=sorted(LanguageManager.LANGUAGES), help="日志语言")
+    common.add_argument('-w', '--workers', type=int, help="并行工作进程数，0 表示全部 CPU 核心")
+    common.add_argument('--list-separators', help="列表分隔符，如 ',;|'（每个字符一个分隔符）")
+    common.add_argument('--report-format', choices=REPORT_FORMATS,
+                        help="报告格式：xlsx（默认）、csv（gzip）、jsonl 或 parquet（需要 pyarrow）")
+    common.add_argument('--engine', choices=ENGINES,
+                        help="单进程执行方式：serial（默认）、pipeline（读取、解析转换、写入重叠执行）"
+                             "或 async（asyncio，多个文件读写同时在途）")
+    common.add_argument('--io-threads', type=int, metavar='N', help=f"pipeline 读取与写入线程数，默认 {IO_THREADS}")
+    common.add_argument('--queue-size', type=int, metavar='N',
+                        help=f"pipeline 每个阶段的在途文件数上限，默认 {PIPELINE_QUEUE_SIZE}")
+    common.add_argument('--concurrency', type=int, metavar='N',
+                        help=f"async 方式同时在途的文件读写数上限，默认 {ASYNC_CONCURRENCY}")
+    common.add_argument('--io-latency', type=float, default=0.0, metavar='SECONDS',
+                        help="每次读写文件前人为增加的延迟，用于模拟高延迟文件系统（测试用）")
+    common.add_argument('--reader', choices=READERS,
+                        help="frontmatter 读取方式：stream（默认，分块读取）或 mmap（内存映射，正文不分配内存）")
+    common.add_argument('--metrics', metavar='PATH', help="将分阶段计时与计数的 JSON 摘要写入文件，- 表示标准输出（此时日志改写到标准错误）")
+    common.add_argument('--prometheus-textfile', metavar='PATH',
+                        help="将统计以 Prometheus textfile 格式写入（供 node_exporter 采集）")
+    common.add_argument('--profile', action='store_true',
+                        help=f"用 cProfile 分析本次运行，在报告目录写入 {PROFILE_NAME}.prof 和热点函数摘要")
+    common.add_argument('--profile-top', type=int, default=30, metavar='N', help="摘要中列出的函数数，默认 30")
+    common.add_argument('--include', action='append', metavar='GLOB',
+                        help="纳入处理的文件模式，可重复指定，默认 '*.[mM][dD]'")
+    common.add_argument('--exclude', action='append', metavar='GLOB',
+                        help="跳过的文件或目录模式，可重复指定，如 --exclude .git --exclude node_modules")
+    
+    analyze = subparsers.add_parser('analyze', parents=[common], help="分析字段类型与冲突并生成报告")
+    analyze.add_argument('-o', '--output-dir', help="报告输出目录，默认为输入目录")
+    analyze.add_argument('--fail-on-conflicts', action='store_true',
+                         help=f"发现类型冲突时以状态码 {EXIT_CONFLICTS} 退出")
+    analyze.add_argument('--cache', nargs='?', const='', metavar='PATH',
+                         help=f"启用增量分析缓存，默认保存在报告目录下的 {ANALYSIS_CACHE_NAME}")
+    analyze.add_argument('--cache-hash', action='store_true', help="mtime 变化时比较内容哈希再决定是否重新解析")
+    
+    process = subparsers.add_parser('process', parents=[common], help="应用合并、类型转换与默认值")
+    target = process.add_mutually_exclusive_group(required=True)
+    target.add_argument('-o', '--output-dir', help="输出目录")
+    target.add_argument('--overwrite', action='store_true', help="直接覆盖源文件")
+    process.add_argument('--ignore-null', action='store_true', help="忽略 null 值冲突")
+    process.add_argument('--two-pass', action='store_true', help="先完整分析再处理（旧流程）")
+    process.add_argument('--journal', metavar='DIR', help="覆盖模式下将原始文件记录到写入日志目录，可用 rollback 恢复")
+    process.add_argument('--checkpoint', metavar='PATH',
+                         help=f"记录已完成文件的清单，默认在报告目录下的 {CHECKPOINT_NAME}（仅 --resume 时）")
+    process.add_argument('--resume', action='store_true', help="从清单续传，跳过已完成的文件")
+    process.add_argument('--checkpoint-interval', type=int, default=500, metavar='N',
+                         help="每完成 N 个文件写入一次清单")
+    
+    rollback = subparsers.add_parser('rollback', help="根据写入日志将文件恢复为处理前的内容")
+    rollback.add_argument('journal_dir', help="process --journal 使用的日志目录")
+    
+    gui = subparsers.add_parser('gui', help="启动图形界面")
+    gui.add_argument('input_dir', nargs='?', help="预填的输入目录")
+    gui.add_argument('output_dir', nargs='?', help="预填的输出目录")
+    gui.add_argument('-c', '--config', help="启动时加载的配置文件")
+    gui.add_argument('-l', '--lang', choices=sorted(LanguageManager.LANGUAGES), default='zh', help="界面语言")
+    
+    startup = subparsers.add_parser('startup-check', help="测量模块导入耗时并校验启动预算")
+    startup.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                         help=f"导入耗时上限（毫秒），默认 {STARTUP_BUDGET_MS}")
+    startup.add_argument('--repeat', type=int, default=3, help="测量次数，取最小值")
+    
+    bench = subparsers.add_parser('benchmark', help="生成合成笔记库并测量分析、报告与处理的吞吐量")
+    bench.add_argument('--files', type=int, default=1000, help="文件数，默认 1000")
+    bench.add_argument('--body-kb', type=float, default=4, help="每个文件的正文大小（KB），默认 4")
+    bench.add_argument('--keys', type=int, default=8, help="每个文件的 frontmatter 字段数，默认 8")
+    bench.add_argument('--conflict-rate', type=float, default=0.05, help="字段值使用其他类型的比例，默认 0.05")
+    bench.add_argument('--cardinality', type=int, default=50, help="每个字段不同取值的数量，默认 50")
+    bench.add_argument('--seed', type=int, default=0, help="随机种子")
+    bench.add_argument('--dir', help="生成笔记库的目录（保留）；默认使用临时目录并在结束后删除")
+    bench.add_argument('--keep', action='store_true', help="保留临时目录")
+    bench.add_argument('-w', '--workers', type=int, default=1, help="并行工作进程数，0 表示全部 CPU 核心")
+    bench.add_argument('--engine', choices=ENGINES, default='serial', help="单进程执行方式")
+    bench.add_argument('--reader', choices=READERS, default='stream', help="frontmatter 读取方式")
+    bench.add_argument('--report-format', choices=REPORT_FORMATS, default='xlsx', help="报告格式")
+    bench.add_argument('--output', metavar='PATH', help="同时将 JSON 结果写入文件")
+    return parser
+
+def run_headless(args) -> int:
+    """不创建 QApplication，直接驱动 FrontmatterAnalyzer，返回退出状态码"""
+    config = {
+        'language': None, 'list_separators': [',', ';', '|'], 'workers': 1, 'cache_file': None,
+        'report_format': 'xlsx',
+        'engine': 'serial', 'io_threads': IO_THREADS, 'queue_size': PIPELINE_QUEUE_SIZE,
+        'concurrency': ASYNC_CONCURRENCY, 'reader': 'stream',
+        'include': list(DEFAULT_INCLUDE), 'exclude': [], 'field_types': {}, 'merge_map': {}, 'default_values': {}
+    }
+    if args.config:
         try:
-            webbrowser.open(f"file://{self.current_report}")
+            config = load_config_file(args.config)
         except Exception as e:
-            QMessageBox.critical(self, "错误", self.lang.get('error_opening_report').format(str(e)))
+            print(f"[ERROR] 配置加载失败: {str(e)}", file=sys.stderr)
+            return EXIT_ERROR
     
-    def log_message(self, message: str, level: str = "info"):
-        """格式化并显示日志消息"""
-        cursor = self.log_area.textCursor()
-        format_ = QTextCharFormat()
-        
+    lang = LanguageManager(args.lang or config['language'] or 'zh')
+    list_separators = list(args.list_separators) if args.list_separators else config['list_separators']
+    workers = args.workers if args.workers is not None else config['workers']
+    report_format = args.report_format or config['report_format']
+    engine = args.engine or config['engine']
+    concurrency = args.concurrency or config['concurrency']
+    io_threads = args.io_threads or config['io_threads']
+    queue_size = args.queue_size or config['queue_size']
+    if report_format not in REPORT_WRITERS:
+        print(f"[ERROR] 不支持的报告格式: {report_format}（可选: {', '.join(REPORT_FORMATS)}）", file=sys.stderr)
+        return EXIT_USAGE
+    missing = report_format_missing(report_format)
+    if missing:
+        print(f"[ERROR] 报告格式 {report_format} 需要安装 {missing}", file=sys.stderr)
+        return EXIT_ERROR
+    
+    if not os.path.isdir(args.input_dir):
+        print(f"[ERROR] {lang.get('invalid_input_dir')}: {args.input_dir}", file=sys.stderr)
+        return EXIT_ERROR
+    
+    errors = []
+    analyzer = FrontmatterAnalyzer()
+    # --metrics - 占用标准输出写 JSON，此时日志全部改走标准错误
+    log_stream = sys.stderr if args.metrics == '-' else sys.stdout
+    def log_callback(message: str, level: str):
         if level == "error":
-            format_.setForeground(QColor(220, 20, 60))
-        elif level == "warning":
-            format_.setForeground(QColor(255, 165, 0))
+            errors.append(message)
+        print(f"[{level.upper()}] {message}", file=sys.stderr if level == "error" else log_stream)
+    analyzer.log_callback = log_callback
+    analyzer.io_latency = args.io_latency
+    analyzer.reader = args.reader or config['reader']
+    if analyzer.reader not in READERS:
+        print(f"[ERROR] 不支持的读取方式: {analyzer.reader}（可选: {', '.join(READERS)}）", file=sys.stderr)
+        return EXIT_USAGE
+    analyzer.include_patterns = args.include or config['include']
+    analyzer.exclude_patterns = config['exclude'] + (args.exclude or [])
+    
+    overwrite = getattr(args, 'overwrite', False)
+    output_dir = args.input_dir if overwrite or not args.output_dir else args.output_dir
+    try:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    except Exception as e:
+        analyzer.log(lang.get('cannot_create_output').format(str(e)), "error")
+        return EXIT_ERROR
+    
+    profiler = None
+    if args.profile:
+        import cProfile
+        if workers != 1:
+            analyzer.log("--profile 只分析主进程，工作进程中的耗时不会出现在结果中", "warning")
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.command == 'analyze':
+            cache_path = config['cache_file'] if args.cache is None else args.cache
+            if cache_path == '':
+                cache_path = str(Path(output_dir) / ANALYSIS_CACHE_NAME)
+            analyzer.analyze_files(args.input_dir, lang, list_separators, workers,
+                                   cache_path=cache_path, cache_hash=args.cache_hash,
+                                   engine=engine, concurrency=concurrency,
+                                   io_threads=io_threads, queue_size=queue_size)
+            if not analyzer.valid_files:
+                analyzer.log(lang.get('no_valid_files'), "warning")
+                return EXIT_ERROR
+            report_path = analyzer.generate_report(output_dir, report_format)
+            analyzer.log(lang.get('analysis_complete').format(report_path), "info")
         else:
-            format_.setForeground(QColor(0, 0, 0))
-        
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ", format_)
-        
-        format_.setFontWeight(QFont.Weight.Bold if level in ("error", "warning") else QFont.Weight.Normal)
-        cursor.insertText(f"[{level.upper()}] ", format_)
-        
-        format_.setFontWeight(QFont.Weight.Normal)
-        cursor.insertText(f"{message}\n", format_)
-        
-        self.log_area.ensureCursorVisible()
-        
-        lines = self.log_area.toPlainText().split("\n")
-        if len(lines) > 1000:
-            self.log_area.setPlainText("\n".join(lines[-1000:]))
-    
-    def closeEvent(self, event):
-        """处理窗口关闭事件"""
-        if self.processing_thread and self.processing_thread.isRunning():
-            reply = QMessageBox.question(
-                self, "确认退出",
-                "后台确认处理仍在进行中，确定要退出吗？",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            checkpoint_path = args.checkpoint
+            if args.resume and not checkpoint_path:
+                checkpoint_path = str(Path(output_dir) / CHECKPOINT_NAME)
+            report_path = analyzer.process_directory(
+                input_dir=args.input_dir, output_dir=output_dir,
+                merge_map=config['merge_map'], field_types=config['field_types'],
+                default_values=config['default_values'],
+                ignore_null_conflicts=args.ignore_null, overwrite=overwrite,
+                thread=None, lang=lang, list_separators=list_separators,
+                single_pass=not args.two_pass, workers=workers, journal_dir=args.journal,
+                checkpoint_path=checkpoint_path, resume=args.resume,
+                checkpoint_interval=args.checkpoint_interval, report_format=report_format,
+                engine=engine, io_threads=io_threads, queue_size=queue_size, concurrency=concurrency
             )
-            if reply == QMessageBox.StandardButton.No:
-                event.ignore()
-                return
-        event.accept()
+            if not report_path:
+                return EXIT_ERROR
+    except Exception as e:
+        analyzer.log(f"处理过程中发生致命错误: {str(e)}", "error")
+        return EXIT_ERROR
+    finally:
+        if profiler:
+            profiler.disable()
+            _write_profile(profiler, output_dir, args.profile_top, analyzer.log)
+        _emit_metrics(analyzer, args)
+    
+    if errors:
+        return EXIT_PARTIAL
+    if args.command == 'analyze' and args.fail_on_conflicts:
+        for type_info in analyzer.type_conflicts.values():
+            if len([t for t, files in type_info.items() if t != 'null' and files]) > 1:
+                return EXIT_CONFLICTS
+    return EXIT_OK
 
-def main():
-    """程序入口"""
-    app = QApplication(sys.argv)
+def _write_profile(profiler: 'cProfile.Profile', output_dir: str, top: int, log: Callable[[str, str], None]):
+    """在报告目录写入 .prof 文件（可用 snakeviz、pstats 等查看）和按累计/自身耗时排序的热点摘要"""
+    import io
+    import pstats
+    prof_path = Path(output_dir) / f"{PROFILE_NAME}.prof"
+    summary_path = Path(output_dir) / f"{PROFILE_NAME}.txt"
+    try:
+        profiler.dump_stats(str(prof_path))
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream).strip_dirs()
+        for sort_key in ('cumulative', 'tottime'):
+            stream.write(f"===== top {top} by {sort_key} =====\n")
+            stats.sort_stats(sort_key).print_stats(top)
+        summary_path.write_text(stream.getvalue(), encoding='utf-8')
+    except OSError as e:
+        log(f"性能分析结果写入失败: {str(e)}", "error")
+        return
+    log(f"性能分析结果: {prof_path}，热点摘要: {summary_path}", "info")
+
+def _emit_metrics(analyzer: FrontmatterAnalyzer, args):
+    """按 --metrics / --prometheus-textfile 输出本轮运行的统计"""
+    import json
+    try:
+        if args.metrics:
+            output = json.dumps(analyzer.run_metrics(command=args.command), ensure_ascii=False, indent=2)
+            if args.metrics == '-':
+                print(output)
+            else:
+                Path(args.metrics).write_text(output + '\n', encoding='utf-8')
+        if args.prometheus_textfile:
+            analyzer.write_prometheus(args.prometheus_textfile, command=args.command)
+    except OSError as e:
+        print(f"[ERROR] 统计输出失败: {str(e)}", file=sys.stderr)
+
+def run_rollback(journal_dir: str) -> int:
+    """执行写入日志回滚，返回退出状态码"""
+    if not os.path.isdir(journal_dir):
+        print(f"[ERROR] 日志目录不存在: {journal_dir}", file=sys.stderr)
+        return EXIT_ERROR
+    def log(message: str, level: str):
+        print(f"[{level.upper()}] {message}", file=sys.stderr if level == "error" else sys.stdout)
+    restored, failed = WriteJournal.rollback(journal_dir, log)
+    log(f"回滚完成：恢复 {restored} 个文件，失败 {failed} 个", "info")
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+def generate_vault(root: str, files: int, body_kb: float = 4, keys: int = 8, conflict_rate: float = 0.05,
+                   cardinality: int = 50, seed: int = 0) -> Dict[str, Any]:
+    """生成合成 Markdown 笔记库，返回 {'files': 文件数, 'bytes': 总字节数}
+
+    字段 field0..fieldN 依次使用 BENCH_FIELD_TYPES 中的类型，每个字段的取值来自
+    cardinality 个不同的值；按 conflict_rate 的概率改用其他类型的值以制造类型冲突。
+    每 100 个文件放在一个子目录中。
+    """
+    import random
+    from datetime import timedelta
+    rng = random.Random(seed)
+    cardinality = max(1, cardinality)
+    
+    def value(field_type: str) -> str:
+        v = rng.randrange(cardinality)
+        if field_type == 'int':
+            return str(v)
+        if field_type == 'float':
+            return f"{v}.5"
+        if field_type == 'list':
+            return f"[tag{v}, tag{(v + 1) % cardinality}]"
+        if field_type == 'date':
+            return (date(2020, 1, 1) + timedelta(days=v)).isoformat()
+        if field_type == 'bool':
+            return 'true' if v % 2 else 'false'
+        return f"value-{v}"
+    
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit --- sed do eiusmod tempor.\n"
+    body = (paragraph * (int(body_kb * 1024) // len(paragraph) + 1))[:int(body_kb * 1024)]
+    total_bytes = 0
+    for i in range(files):
+        directory = Path(root) / f"d{i // 100:05d}"
+        if i % 100 == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        lines = [f"title: Note {i}"]
+        for k in range(keys):
+            field_type = BENCH_FIELD_TYPES[k % len(BENCH_FIELD_TYPES)]
+            if rng.random() < conflict_rate:
+                field_type = rng.choice([t for t in BENCH_FIELD_TYPES if t != field_type])
+            lines.append(f"field{k}: {value(field_type)}")
+        data = ("---\n" + "\n".join(lines) + f"\n---\n\n# Note {i}\n\n" + body).encode('utf-8')
+        (directory / f"note{i:07d}.md").write_bytes(data)
+        total_bytes += len(data)
+    return {'files': files, 'bytes': total_bytes}
+
+def peak_rss_mb() -> Optional[float]:
+    """本进程及已结束子进程中的最大常驻内存（MB）；无法获取时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / 1048576, 1)
+    # Linux 上 ru_maxrss 以 KB 为单位，macOS 上以字节为单位
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak * scale / 1048576, 1)
+
+def run_benchmark(args) -> int:
+    """生成合成笔记库，分别计时 analyze_files、generate_report 与 process_directory，输出 JSON"""
+    import json
+    import shutil
+    import tempfile
+    missing = report_format_missing(args.report_format)
+    if missing:
+        print(f"[ERROR] 报告格式 {args.report_format} 需要安装 {missing}", file=sys.stderr)
+        return EXIT_ERROR
+    root = Path(args.dir) if args.dir else Path(tempfile.mkdtemp(prefix='frontmatter-bench-'))
+    vault = root / 'vault'
+    try:
+        if vault.exists():
+            shutil.rmtree(vault)
+        start = time.perf_counter()
+        spec = generate_vault(str(vault), args.files, args.body_kb, args.keys, args.conflict_rate,
+                              args.cardinality, args.seed)
+        generate_seconds = time.perf_counter() - start
+        
+        lang = LanguageManager('en')
+        list_separators = [',', ';', '|']
+        errors = []
+        
+        def make_analyzer() -> FrontmatterAnalyzer:
+            analyzer = FrontmatterAnalyzer()
+            analyzer.log_callback = lambda message, level: errors.append(message) if level == "error" else None
+            analyzer.reader = args.reader
+            return analyzer
+        
+        field_types = {f"field{k}": BENCH_FIELD_TYPES[k % len(BENCH_FIELD_TYPES)] for k in range(args.keys)}
+        phases = {}
+        
+        def timed(name: str, func: Callable[[], Any]):
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+            phases[name] = {
+                'seconds': round(seconds, 4),
+                'files_per_sec': round(spec['files'] / seconds, 1) if seconds else None,
+                'mb_per_sec': round(spec['bytes'] / 1048576 / seconds, 2) if seconds else None,
+                'peak_rss_mb': peak_rss_mb(),
+            }
+        
+        analyzer = make_analyzer()
+        timed('analyze', lambda: analyzer.analyze_files(
+            str(vault), lang, list_separators, args.workers, engine=args.engine))
+        timed('report', lambda: analyzer.generate_report(str(root / 'report'), args.report_format))
+        # process 使用新的分析器，记忆表不会沿用 analyze 阶段的结果；
+        # 其耗时包含自身的报告生成，每个文件都会因默认值而被重写
+        processor = make_analyzer()
+        timed('process', lambda: processor.process_directory(
+            str(vault), str(root / 'output'), {}, field_types, {'bench_default': ('str', 'x')},
+            False, False, None, lang, list_separators, workers=args.workers, engine=args.engine,
+            report_format=args.report_format))
+        
+        result = {
+            'params': {
+                'files': args.files, 'body_kb': args.body_kb, 'keys': args.keys,
+                'conflict_rate': args.conflict_rate, 'cardinality': args.cardinality, 'seed': args.seed,
+                'workers': args.workers, 'engine': args.engine, 'reader': args.reader,
+                'report_format': args.report_format,
+            },
+            'vault': {'files': spec['files'], 'mb': round(spec['bytes'] / 1048576, 2),
+                      'generate_seconds': round(generate_seconds, 3)},
+            'phases': phases,
+            'valid_files': len(analyzer.valid_files),
+            'errors': len(errors),
+            'yaml_backend': YAML_BACKEND,
+            'python': sys.version.split()[0],
+        }
+    finally:
+        if not args.dir and not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    return EXIT_PARTIAL if errors else EXIT_OK
+
+def run_gui(lang_code: str = 'zh', input_dir: Optional[str] = None,
+            output_dir: Optional[str] = None, config_path: Optional[str] = None) -> int:
+    """启动图形界面，返回 Qt 事件循环的退出码"""
+    gui = _load_gui()
+    app = gui.QApplication(sys.argv)
     app.setStyle('Fusion')
     
     app.setApplicationName("Markdown Frontmatter Processor")
     app.setApplicationVersion("1.4.0")
     app.setOrganizationName("Data Tools")
     
-    # 支持命令行指定语言
-    lang_code = 'zh'  # 默认中文
-    if len(sys.argv) > 1 and sys.argv[1] in LanguageManager.LANGUAGES:
-        lang_code = sys.argv[1]
-    lang = LanguageManager(lang_code)
-    
-    window = MainWindow(lang)
-    
-    if len(sys.argv) > 2 and os.path.isdir(sys.argv[2]):
-        window.input_dir_edit.setText(str(Path(sys.argv[2])))
-        if len(sys.argv) > 3 and os.path.isdir(sys.argv[3]):
-            window.output_dir_edit.setText(str(Path(sys.argv[3])))
-    elif len(sys.argv) > 2 and os.path.isfile(sys.argv[2]) and sys.argv[2].endswith(('.yaml', '.yml')):
-        window.config_edit.setText(sys.argv[2])
+    window = gui.MainWindow(LanguageManager(lang_code))
+    
+    if input_dir and os.path.isdir(input_dir):
+        window.input_dir_edit.setText(str(Path(input_dir)))
+        if output_dir and os.path.isdir(output_dir):
+            window.output_dir_edit.setText(str(Path(output_dir)))
+    if config_path and os.path.isfile(config_path):
+        window.config_edit.setText(config_path)
         window.load_config()
     
     window.show()
+    return app.exec()
+
+def _legacy_args(argv: List[str]):
+    """解析旧式参数：<语言> <输入目录|配置文件> [输出目录] [配置文件] [--batch] [process 子命令选项...]
+
+    第一个以 - 开头的参数（--batch 除外）及其后的内容原样作为 process 子命令的选项返回。
+    """
+    argv = [a for a in argv if a != '--batch']
+    split = next((i for i, a in enumerate(argv) if a.startswith('-')), len(argv))
+    positional, options = argv[:split], argv[split:]
+    lang_code = 'zh'  # 默认中文
+    if positional and positional[0] in LanguageManager.LANGUAGES:
+        lang_code = positional.pop(0)
+    config_path = next((a for a in positional if a.endswith(('.yaml', '.yml')) and os.path.isfile(a)), None)
+    dirs = [a for a in positional if a != config_path]
+    input_dir = dirs[0] if dirs else None
+    output_dir = dirs[1] if len(dirs) > 1 else None
+    return lang_code, input_dir, output_dir, config_path, options
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """程序入口：子命令 analyze/process 无界面运行，gui 或旧式参数启动图形界面"""
+    argv = sys.argv[1:] if argv is None else argv
     
-    if '--batch' in sys.argv:
-        if sys.argv and window.input_dir_edit.text() and window.output_dir_edit.text():
-            window.start_processing()
+    if argv and (argv[0] in CLI_COMMANDS or argv[0] in ('-h', '--help')):
+        args = _build_parser().parse_args(argv)
+        if args.command == 'gui':
+            return run_gui(args.lang, args.input_dir, args.output_dir, args.config)
+        if args.command == 'startup-check':
+            return run_startup_check(args.budget_ms, args.repeat)
+        if args.command == 'rollback':
+            return run_rollback(args.journal_dir)
+        if args.command == 'benchmark':
+            return run_benchmark(args)
+        return run_headless(args)
     
-    sys.exit(app.exec())
+    lang_code, input_dir, output_dir, config_path, options = _legacy_args(argv)
+    if '--batch' in argv:
+        # 旧式批处理参数转为无界面 process 子命令，其余选项（如 --profile）原样透传
+        if not input_dir or not output_dir:
+            print("[ERROR] --batch 需要输入目录和输出目录", file=sys.stderr)
+            return EXIT_USAGE
+        batch_argv = ['process', input_dir, '-o', output_dir, '-l', lang_code]
+        if config_path:
+            batch_argv += ['-c', config_path]
+        return run_headless(_build_parser().parse_args(batch_argv + options))
+    if options:
+        print(f"[WARNING] 图形界面模式忽略选项: {' '.join(options)}", file=sys.stderr)
+    return run_gui(lang_code, input_dir, output_dir, config_path)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())